@@ -1,11 +1,12 @@
 import sys
 import json
-import joblib
-import pandas as pd
-import numpy as np
-import yfinance as yf
+import struct
+import threading
 import os
 
+# pandas, yfinance and joblib are imported where they are first needed,
+# so that `--serve --lazy` workers report ready before loading them.
+
 # Suppress warnings
 import warnings
 warnings.filterwarnings('ignore')
@@ -60,72 +61,117 @@ def get_latest_features_from_df(df_processed):
 
     return df_processed[feature_cols].iloc[-1:].values
 
-def main():
-    if len(sys.argv) < 2:
-        print(json.dumps({"error": "No ticker provided"}))
-        sys.exit(1)
+class PredictionError(Exception):
+    """A request that failed; the message is returned to the caller."""
+
+
+_artifacts = None
+_artifacts_lock = threading.Lock()
+
+
+def load_artifacts():
+    """Load the model and scaler once per process."""
+    global _artifacts
+    with _artifacts_lock:
+        if _artifacts is None:
+            _artifacts = _load_artifacts()
+    return _artifacts
+
+
+def _load_artifacts():
+    import joblib
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    model_path = os.path.join(script_dir, "models", "xgb_model.pkl")
+    scaler_path = os.path.join(script_dir, "models", "scaler.pkl")
+
+    if not os.path.exists(model_path):
+        raise PredictionError(f"Model not found at {model_path}")
 
-    ticker = sys.argv[1].upper()
-    days_to_predict = int(sys.argv[2]) if len(sys.argv) > 2 else 1
-    
-    # Load Artifacts
     try:
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        model_path = os.path.join(script_dir, "models", "xgb_model.pkl")
-        scaler_path = os.path.join(script_dir, "models", "scaler.pkl")
-        
-        if not os.path.exists(model_path):
-             print(json.dumps({"error": f"Model not found at {model_path}"}))
-             sys.exit(1)
-
-        model = joblib.load(model_path)
-        scaler = joblib.load(scaler_path)
+        return joblib.load(model_path), joblib.load(scaler_path)
     except Exception as e:
-        print(json.dumps({"error": f"Failed to load models: {str(e)}"}))
-        sys.exit(1)
+        raise PredictionError(f"Failed to load models: {str(e)}")
+
+
+def warm_up():
+    """Import the heavy libraries and load the model (errors are reported per request)."""
+    try:
+        import pandas  # noqa: F401
+        import yfinance  # noqa: F401
+        load_artifacts()
+    except Exception as e:
+        print(f"Warm-up failed: {e}", file=sys.stderr)
+
+
+def predict_stream(ticker, days_to_predict):
+    """
+    Run one forecast, yielding (kind, payload) events as results become
+    available: "history" first, then one "forecast" per day, then
+    "summary".  Raises PredictionError.
+    """
+    import pandas as pd
+    import yfinance as yf
+
+    ticker = ticker.upper()
+    model, scaler = load_artifacts()
 
     # Fetch History
     try:
         # Fetch 1 year to ensure robustness for iterative updates
         df_full = yf.download(ticker, period="1y", progress=False)
-        
+
         if isinstance(df_full.columns, pd.MultiIndex):
             df_full.columns = df_full.columns.droplevel(1)
-            
+
         if df_full.empty:
-             raise ValueError(f"No data found for {ticker}")
+            raise ValueError(f"No data found for {ticker}")
 
     except Exception as e:
-        print(json.dumps({"error": f"Error fetching history: {str(e)}"}))
-        sys.exit(1)
+        raise PredictionError(f"Error fetching history: {str(e)}")
 
     try:
-        forecast = []
-        current_df = df_full.copy()
-        
-        # Iterative Prediction Loop
-        for i in range(days_to_predict):
+        current_price = float(df_full['Close'].iloc[-1])
+
+        # Prepare Historical Data (Last 60 days for better context)
+        # Use ORIGINAL df_full for history display, not the projected one with flat lines
+        history_df = df_full.tail(60).reset_index()
+        history_data = []
+        for _, row in history_df.iterrows():
+            history_data.append({
+                "date": row['Date'].strftime('%Y-%m-%d'),
+                "Close": float(row['Close']),
+                "High": float(row['High']),
+                "Low": float(row['Low']),
+                "Open": float(row['Open'])
+            })
+    except Exception as e:
+        raise PredictionError(str(e))
+
+    yield "history", {"ticker": ticker, "current_price": current_price, "history": history_data}
+
+    current_df = df_full.copy()
+    predicted_price = current_price
+
+    # Iterative Prediction Loop
+    for i in range(days_to_predict):
+        try:
             # Calculate features on current_df
             df_features = calculate_features(current_df)
-            
+
             # Get latest feature row
             features = get_latest_features_from_df(df_features)
-            
+
             # Scale & Predict
             features_scaled = scaler.transform(features)
             prediction = model.predict(features_scaled)
             predicted_price = float(prediction[0])
-            
-            forecast.append({
-                "day": i + 1,
-                "price": predicted_price
-            })
-            
+
             # Append prediction to current_df to serve as history for next iteration
             # We assume OHLC are all the predicted price for simplicity in this projection
             last_date = current_df.index[-1]
             next_date = last_date + pd.Timedelta(days=1)
-            
+
             new_row = pd.DataFrame({
                 "Open": [predicted_price],
                 "High": [predicted_price],
@@ -133,22 +179,14 @@ def main():
                 "Close": [predicted_price],
                 "Volume": [current_df['Volume'].iloc[-1]] # Assume steady volume
             }, index=[next_date])
-            
+
             current_df = pd.concat([current_df, new_row])
+        except Exception as e:
+            raise PredictionError(str(e))
 
-        # Prepare Historical Data (Last 60 days for better context)
-        # Use ORIGINAL df_full for history display, not the projected one with flat lines
-        history_df = df_full.tail(60).reset_index()
-        history_data = []
-        for _, row in history_df.iterrows():
-            history_data.append({
-                "date": row['Date'].strftime('%Y-%m-%d'),
-                "Close": float(row['Close']),
-                "High": float(row['High']),
-                "Low": float(row['Low']),
-                "Open": float(row['Open'])
-            })
-            
+        yield "forecast", {"day": i + 1, "price": predicted_price}
+
+    try:
         # Extract Latest Indicators from the original valid data
         df_indicators = calculate_features(df_full)
         latest_indicators = df_indicators.iloc[-1]
@@ -160,23 +198,124 @@ def main():
             "SMA_20": float(latest_indicators['SMA_20']) if not pd.isna(latest_indicators['SMA_20']) else 0.0,
             "SMA_50": float(latest_indicators['SMA_50']) if not pd.isna(latest_indicators['SMA_50']) else 0.0
         }
+    except Exception as e:
+        raise PredictionError(str(e))
 
-        result = {
-            "ticker": ticker,
-            "forecast": forecast,
-            "sentiment": "Bullish" if forecast[-1]["price"] > float(df_full['Close'].iloc[-1]) else "Bearish",
-            "current_price": float(df_full['Close'].iloc[-1]),
-            "history": history_data,
-            "indicators": current_indicators
-        }
-        print(json.dumps(result))
-        
-    except ValueError as val_err:
-        print(json.dumps({"error": str(val_err)}))
+    yield "summary", {
+        "sentiment": "Bullish" if predicted_price > current_price else "Bearish",
+        "indicators": current_indicators
+    }
+
+
+def predict(ticker, days_to_predict):
+    """Run one forecast and return the full response dict (raises PredictionError)."""
+    result = {"forecast": []}
+    for kind, payload in predict_stream(ticker, days_to_predict):
+        if kind == "forecast":
+            result["forecast"].append(payload)
+        else:
+            result.update(payload)
+
+    if not result["forecast"]:
+        raise PredictionError("Number of days to predict must be at least 1")
+
+    return {
+        "ticker": result["ticker"],
+        "forecast": result["forecast"],
+        "sentiment": result["sentiment"],
+        "current_price": result["current_price"],
+        "history": result["history"],
+        "indicators": result["indicators"]
+    }
+
+
+def serve(lazy=False):
+    """
+    Long-lived mode: one JSON request per stdin line, answered with
+    length-prefixed frames on stdout.
+
+    Each frame is a 4-byte big-endian length followed by that many bytes
+    of UTF-8 JSON.  Requests and the frames they produce:
+
+      {"id": 1, "ticker": "AAPL", "days": 7}
+          -> {"id": 1, "type": "history", ...}
+          -> {"id": 1, "type": "forecast", "day": 1, "price": ...}   (one per day)
+          -> {"id": 1, "type": "summary", "sentiment": ..., "indicators": {...}}
+          -> {"id": 1, "type": "done"}
+          or, at any point, {"id": 1, "type": "error", "error": "..."}
+      {"id": 2, "type": "ping"}
+          -> {"id": 2, "type": "pong"}
+
+    A {"type": "ready"} frame is written once the model is loaded.  With
+    ``lazy=True`` it is written immediately and the imports and model
+    load run in a background thread; the first request waits for them.
+    """
+    # Keep stray prints from libraries out of the frame stream
+    out = sys.stdout.buffer
+    sys.stdout = sys.stderr
+
+    def send(message):
+        data = json.dumps(message).encode("utf-8")
+        out.write(struct.pack(">I", len(data)) + data)
+        out.flush()
+
+    if lazy:
+        threading.Thread(target=warm_up, daemon=True).start()
+    else:
+        try:
+            load_artifacts()
+        except PredictionError as e:
+            send({"type": "error", "id": None, "error": str(e)})
+            sys.exit(1)
+    send({"type": "ready", "pid": os.getpid()})
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        try:
+            request = json.loads(line)
+        except ValueError:
+            send({"id": None, "type": "error", "error": "Invalid JSON request"})
+            continue
+
+        request_id = request.get("id")
+        if request.get("type") == "ping":
+            send({"id": request_id, "type": "pong"})
+            continue
+
+        try:
+            ticker = request.get("ticker")
+            if not ticker:
+                raise PredictionError("No ticker provided")
+            days = int(request.get("days", 1))
+            if days < 1:
+                raise PredictionError("Number of days to predict must be at least 1")
+            for kind, payload in predict_stream(ticker, days):
+                send({"id": request_id, "type": kind, **payload})
+            send({"id": request_id, "type": "done"})
+        except Exception as e:
+            send({"id": request_id, "type": "error", "error": str(e)})
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--serve":
+        serve(lazy="--lazy" in sys.argv[2:])
+        return
+
+    if len(sys.argv) < 2:
+        print(json.dumps({"error": "No ticker provided"}))
         sys.exit(1)
-    except Exception as e:
+
+    ticker = sys.argv[1].upper()
+    days_to_predict = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+
+    try:
+        result = predict(ticker, days_to_predict)
+    except PredictionError as e:
         print(json.dumps({"error": str(e)}))
         sys.exit(1)
+    print(json.dumps(result))
+
 
 if __name__ == "__main__":
     main()
@@ -2,9 +2,9 @@ const express = require('express');
 const mongoose = require('mongoose');
 const cors = require('cors');
 const dotenv = require('dotenv');
-const { spawn } = require('child_process');
 const path = require('path');
 const PredictionLog = require('./models/PredictionLog');
+const WorkerPool = require('./workerPool');
 
 dotenv.config();
 
@@ -20,66 +20,103 @@ mongoose.connect(process.env.MONGO_URI || 'mongodb://localhost:27017/stock_predi
   .then(() => console.log('MongoDB Connected'))
   .catch(err => console.error('MongoDB Connection Error:', err));
 
-// Routes
-app.post('/api/predict', async (req, res) => {
+// Warm Python prediction workers (model loaded once per worker)
+const workerPool = new WorkerPool({
+  // Use local venv python for stability
+  pythonExecutable: process.env.PYTHON_EXECUTABLE || path.join(__dirname, 'venv', 'Scripts', 'python.exe'),
+  scriptPath: path.join(__dirname, 'python', 'predict_worker.py'),
+  // --lazy: report ready at once and load pandas/yfinance/model in the background
+  args: process.env.PREDICT_WORKER_LAZY === '0' ? ['--serve'] : ['--serve', '--lazy'],
+  size: parseInt(process.env.PREDICT_WORKERS || '2'),
+  requestTimeoutMs: parseInt(process.env.PREDICT_TIMEOUT_MS || '60000'),
+}).start();
+
+// Log to Database (Store the first prediction or last, depending on preference. Here we store the first day)
+async function logPrediction(ticker, forecast) {
+  try {
+    const newLog = new PredictionLog({
+      ticker,
+      predictedPrice: forecast[0].price
+    });
+    await newLog.save();
+  } catch (err) {
+    console.error('Failed to log prediction:', err.message);
+  }
+}
+
+function parsePredictRequest(req, res) {
   const { ticker, days } = req.body;
   const daysToPredict = days || 7; // Default to 7 days if not specified
 
   if (!ticker) {
-    return res.status(400).json({ error: 'Ticker is required' });
+    res.status(400).json({ error: 'Ticker is required' });
+    return null;
   }
+  return { ticker, days: parseInt(daysToPredict) };
+}
 
-  // Spawn Python Process
-  const pythonScriptPath = path.join(__dirname, 'python', 'predict_worker.py');
+// Routes
+app.post('/api/predict', async (req, res) => {
+  const request = parsePredictRequest(req, res);
+  if (!request) return;
 
-  // Use local venv python for stability
-  const pythonExecutable = path.join(__dirname, 'venv', 'Scripts', 'python.exe');
-  const pythonProcess = spawn(pythonExecutable, [pythonScriptPath, ticker, daysToPredict.toString()]);
-
-  let dataString = '';
-  let errorString = '';
-
-  pythonProcess.stdout.on('data', (data) => {
-    dataString += data.toString();
-  });
-
-  pythonProcess.stderr.on('data', (data) => {
-    errorString += data.toString();
-  });
-
-  pythonProcess.on('error', (err) => {
-    console.error('Failed to start python process:', err);
-    res.status(500).json({ error: 'Failed to execute prediction script', details: err.message });
-  });
-
-  pythonProcess.on('close', async (code) => {
-    if (code !== 0) {
-      console.error(`Python script exited with code ${code}`);
-      console.error(`Error output: ${errorString}`);
-      console.error(`Standard output: ${dataString}`); // Log stdout as it may contain the JSON error
-      return res.status(500).json({ error: 'Prediction failed', details: errorString || dataString });
-    }
+  // Reassemble the streamed frames into the single response object
+  const result = { forecast: [] };
+  let final;
+  try {
+    final = await workerPool.request(request, (frame) => {
+      const { id, type, ...payload } = frame;
+      if (type === 'forecast') {
+        result.forecast.push(payload);
+      } else if (type === 'history' || type === 'summary') {
+        Object.assign(result, payload);
+      }
+    });
+  } catch (err) {
+    console.error('Prediction worker failed:', err.message);
+    return res.status(500).json({ error: 'Prediction failed', details: err.message });
+  }
 
-    try {
-      const result = JSON.parse(dataString);
+  if (final.type === 'error') {
+    return res.status(400).json({ error: final.error });
+  }
 
-      if (result.error) {
-        return res.status(400).json({ error: result.error });
-      }
+  await logPrediction(result.ticker, result.forecast);
+  res.json(result);
+});
 
-      // Log to Database (Store the first prediction or last, depending on preference. Here we store the first day)
-      const newLog = new PredictionLog({
-        ticker: result.ticker,
-        predictedPrice: result.forecast[0].price
-      });
-      await newLog.save();
-
-      res.json(result);
-    } catch (err) {
-      console.error('Error parsing JSON from python script:', err);
-      res.status(500).json({ error: 'Internal Server Error', details: 'Invalid response from predictor' });
+/**
+ * POST /api/predict/stream
+ * Same request as /api/predict, answered as newline-delimited JSON: a
+ * "history" line, one "forecast" line per day as it is computed, then
+ * "summary" and "done" (or an "error" line).
+ */
+app.post('/api/predict/stream', async (req, res) => {
+  const request = parsePredictRequest(req, res);
+  if (!request) return;
+
+  res.setHeader('Content-Type', 'application/x-ndjson');
+  let ticker = request.ticker.toUpperCase();
+  const forecast = [];
+  try {
+    const final = await workerPool.request(request, (frame) => {
+      const { id, ...line } = frame;
+      if (frame.type === 'history') ticker = frame.ticker;
+      if (frame.type === 'forecast') forecast.push({ day: frame.day, price: frame.price });
+      res.write(JSON.stringify(line) + '\n');
+    });
+    if (final.type === 'done') {
+      await logPrediction(ticker, forecast);
     }
-  });
+  } catch (err) {
+    console.error('Prediction worker failed:', err.message);
+    res.write(JSON.stringify({ type: 'error', error: 'Prediction failed', details: err.message }) + '\n');
+  }
+  res.end();
+});
+
+app.get('/api/workers', (req, res) => {
+  res.json(workerPool.stats());
 });
 
 app.get('/api/history', async (req, res) => {
@@ -0,0 +1,255 @@
+const { spawn } = require('child_process');
+
+/**
+ * Splits a byte stream into length-prefixed JSON frames
+ * (4-byte big-endian length, then UTF-8 JSON).
+ */
+class FrameDecoder {
+  constructor(onFrame) {
+    this.onFrame = onFrame;
+    this.buffer = Buffer.alloc(0);
+  }
+
+  push(chunk) {
+    this.buffer = this.buffer.length ? Buffer.concat([this.buffer, chunk]) : chunk;
+    while (this.buffer.length >= 4) {
+      const length = this.buffer.readUInt32BE(0);
+      if (this.buffer.length < 4 + length) break;
+      const body = this.buffer.subarray(4, 4 + length);
+      this.buffer = this.buffer.subarray(4 + length);
+      this.onFrame(JSON.parse(body.toString('utf8')));
+    }
+  }
+}
+
+/**
+ * Pool of long-lived `predict_worker.py --serve` processes.
+ *
+ * Each worker loads the model once and then answers newline-delimited
+ * JSON requests on stdin with length-prefixed frames on stdout (see
+ * `serve()` in predict_worker.py). Requests are queued until a worker is idle,
+ * idle workers are pinged periodically, and a worker that crashes,
+ * hangs or fails a health check is killed and restarted.
+ */
+class WorkerPool {
+  constructor({
+    pythonExecutable,
+    scriptPath,
+    args = ['--serve'],
+    size = 2,
+    requestTimeoutMs = 60000,
+    healthCheckIntervalMs = 30000,
+    healthCheckTimeoutMs = 5000,
+    restartDelayMs = 1000,
+    maxRestartDelayMs = 30000,
+  }) {
+    this.pythonExecutable = pythonExecutable;
+    this.scriptPath = scriptPath;
+    this.args = args;
+    this.size = size;
+    this.requestTimeoutMs = requestTimeoutMs;
+    this.healthCheckIntervalMs = healthCheckIntervalMs;
+    this.healthCheckTimeoutMs = healthCheckTimeoutMs;
+    this.restartDelayMs = restartDelayMs;
+    this.maxRestartDelayMs = maxRestartDelayMs;
+
+    this.workers = [];
+    this.queue = []; // requests waiting for an idle worker
+    this.nextId = 1;
+    this.closed = false;
+    this.restarts = 0;
+  }
+
+  start() {
+    for (let i = 0; i < this.size; i++) {
+      this.workers.push(this._spawn());
+    }
+    this.healthTimer = setInterval(() => this._healthCheck(), this.healthCheckIntervalMs);
+    this.healthTimer.unref();
+    return this;
+  }
+
+  /**
+   * Send one request ({ ticker, days }). `onFrame` is called with every
+   * frame as it arrives; the promise resolves with the final frame
+   * ({ type: 'done' } or { type: 'error', error }).
+   */
+  request(payload, onFrame = () => {}) {
+    if (this.closed) {
+      return Promise.reject(new Error('Worker pool is closed'));
+    }
+    return new Promise((resolve, reject) => {
+      const job = { payload, onFrame, resolve, reject };
+      // Give up if no worker becomes free in time (e.g. all are restarting)
+      job.queueTimer = setTimeout(() => {
+        const index = this.queue.indexOf(job);
+        if (index !== -1) {
+          this.queue.splice(index, 1);
+          reject(new Error('No prediction worker available'));
+        }
+      }, this.requestTimeoutMs);
+      this.queue.push(job);
+      this._drain();
+    });
+  }
+
+  stats() {
+    return {
+      size: this.size,
+      ready: this.workers.filter((w) => w.ready).length,
+      busy: this.workers.filter((w) => w.job).length,
+      queued: this.queue.length,
+      restarts: this.restarts,
+    };
+  }
+
+  close() {
+    this.closed = true;
+    clearInterval(this.healthTimer);
+    for (const job of this.queue.splice(0)) {
+      clearTimeout(job.queueTimer);
+      job.reject(new Error('Worker pool is closed'));
+    }
+    for (const worker of this.workers) {
+      worker.process.kill();
+    }
+  }
+
+  // ── Internals ───────────────────────────────────────────────────────
+
+  _spawn(failures = 0) {
+    const child = spawn(this.pythonExecutable, [this.scriptPath, ...this.args], {
+      stdio: ['pipe', 'pipe', 'pipe'],
+    });
+    // failures: consecutive exits before becoming ready (restart back-off)
+    const worker = { process: child, ready: false, job: null, ping: null, failures };
+
+    const decoder = new FrameDecoder((frame) => this._onFrame(worker, frame));
+    child.stdout.on('data', (chunk) => {
+      try {
+        decoder.push(chunk);
+      } catch (err) {
+        // The stream can't be resynchronised after a corrupt frame
+        console.error(`predict_worker[${child.pid}] sent an invalid frame:`, err.message);
+        child.kill('SIGKILL');
+      }
+    });
+
+    child.stderr.on('data', (data) => {
+      console.error(`predict_worker[${child.pid}]: ${data.toString().trimEnd()}`);
+    });
+
+    child.on('error', (err) => {
+      console.error('Failed to start python worker:', err.message);
+      // A process that never spawned emits no 'exit'; schedule the restart here
+      if (child.pid === undefined) this._onExit(worker, null, null);
+    });
+    child.stdin.on('error', (err) => {
+      console.error(`predict_worker[${child.pid}] stdin error:`, err.message);
+    });
+
+    child.on('exit', (code, signal) => this._onExit(worker, code, signal));
+    return worker;
+  }
+
+  _onFrame(worker, frame) {
+    if (frame.type === 'ready') {
+      worker.ready = true;
+      worker.failures = 0;
+      this._drain();
+      return;
+    }
+    if (!worker.ready) {
+      console.error('Python worker failed to start:', frame.error);
+      return;
+    }
+
+    if (frame.type === 'pong' && worker.ping && frame.id === worker.ping.id) {
+      clearTimeout(worker.ping.timer);
+      worker.ping = null;
+      this._drain();
+      return;
+    }
+
+    const job = worker.job;
+    if (!job || frame.id !== job.id) return;
+
+    try {
+      job.onFrame(frame);
+    } catch (err) {
+      console.error('Frame handler failed:', err.message);
+    }
+    if (frame.type === 'done' || frame.type === 'error') {
+      clearTimeout(job.timer);
+      worker.job = null;
+      job.resolve(frame);
+      this._drain();
+    }
+  }
+
+  _onExit(worker, code, signal) {
+    console.error(`predict_worker[${worker.process.pid}] exited (code=${code}, signal=${signal})`);
+    const failures = worker.ready ? 0 : worker.failures + 1;
+    worker.ready = false;
+    if (worker.ping) {
+      clearTimeout(worker.ping.timer);
+    }
+    if (worker.job) {
+      clearTimeout(worker.job.timer);
+      worker.job.reject(new Error('Prediction worker crashed'));
+      worker.job = null;
+    }
+
+    const index = this.workers.indexOf(worker);
+    if (index === -1 || this.closed) {
+      return;
+    }
+    const delay = Math.min(this.restartDelayMs * 2 ** failures, this.maxRestartDelayMs);
+    setTimeout(() => {
+      if (this.closed) return;
+      this.restarts += 1;
+      this.workers[index] = this._spawn(failures);
+    }, delay);
+  }
+
+  _send(worker, message) {
+    worker.process.stdin.write(JSON.stringify(message) + '\n');
+  }
+
+  _drain() {
+    for (const worker of this.workers) {
+      if (!this.queue.length) return;
+      if (!worker.ready || worker.job || worker.ping) continue;
+
+      const { payload, onFrame, resolve, reject, queueTimer } = this.queue.shift();
+      clearTimeout(queueTimer);
+      const id = this.nextId++;
+      const timer = setTimeout(() => {
+        // A hung worker is killed; the exit handler rejects and restarts it
+        console.error(`predict_worker[${worker.process.pid}] timed out on request ${id}`);
+        worker.process.kill('SIGKILL');
+      }, this.requestTimeoutMs);
+
+      worker.job = { id, onFrame, resolve, reject, timer };
+      this._send(worker, { id, ...payload });
+    }
+  }
+
+  _healthCheck() {
+    for (const worker of this.workers) {
+      if (!worker.ready || worker.job || worker.ping) continue;
+
+      const id = this.nextId++;
+      const timer = setTimeout(() => {
+        console.error(`predict_worker[${worker.process.pid}] failed health check`);
+        worker.process.kill('SIGKILL');
+      }, this.healthCheckTimeoutMs);
+
+      worker.ping = { id, timer };
+      this._send(worker, { id, type: 'ping' });
+    }
+  }
+}
+
+module.exports = WorkerPool;
+module.exports.FrameDecoder = FrameDecoder;
@@ -5,9 +5,29 @@ REST API endpoints for training models and generating predictions.
 
 Endpoints:
   POST /predict      — Predict future stock prices
-  POST /train        — Train/retrain a model for a ticker
+  POST /predict/batch — Predict many tickers, streamed as NDJSON
+  POST /train        — Queue a training job for a ticker
+  GET  /jobs/{id}    — Training job status, progress and metrics
   GET  /history/{t}  — Get recent historical data for charting
-  GET  /health       — Health check
+  GET  /health       — Liveness check
+  GET  /ready        — Readiness check (503 until warm-up has finished)
+  GET  /stats        — Cache and executor counters for monitoring
+
+Blocking work never runs on the event loop: training jobs go to a
+process pool and prediction / data fetching to a thread pool.  Both pools are
+bounded (see the ``STOCK_API_*`` environment variables); when one is
+full the endpoint answers 503 with a Retry-After header.
+
+The prediction stack (pandas, scikit-learn, yfinance, …) is imported on
+the first request that needs it, inside a worker thread, so the service
+answers /health as soon as it starts.  Set ``STOCK_API_LAZY_IMPORTS=0``
+to import it at startup instead.
+
+On startup the service can warm up a declared list of tickers
+(``STOCK_API_WARMUP_TICKERS``: comma-separated, or ``*`` for every
+trained model): artifacts are loaded, data and feature caches primed
+and one inference run per model.  /ready reports 503 until this is done,
+while /health reports liveness from the first moment.
 
 Author : Student ML Engineer
 Project: Stock Price Prediction System
@@ -15,17 +35,24 @@ Project: Stock Price Prediction System
 
 import os
 import sys
+import json
+import asyncio
 import logging
+import multiprocessing
+from contextlib import asynccontextmanager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, Optional
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
 
 # Add project root to path so we can import src modules
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, PROJECT_ROOT)
 
-from src.predict import predict_stock, get_historical_data
-from src.train import train_model
+from src.concurrency import BoundedExecutor, Saturated
+from src.jobs import JobQueue, JobStore
 
 # ---------------------------------------------------------------------------
 # Logging
@@ -33,6 +60,117 @@ from src.train import train_model
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 logger = logging.getLogger(__name__)
 
+# ---------------------------------------------------------------------------
+# Executors
+# ---------------------------------------------------------------------------
+CPU_WORKERS = int(os.getenv("STOCK_API_CPU_WORKERS", max(1, (os.cpu_count() or 2) // 2)))
+CPU_QUEUE_DEPTH = int(os.getenv("STOCK_API_CPU_QUEUE", CPU_WORKERS * 2))
+# Cores each training job may use, so CPU_WORKERS jobs share the machine
+TRAIN_N_JOBS = int(os.getenv("STOCK_API_TRAIN_JOBS", max(1, (os.cpu_count() or 2) // CPU_WORKERS)))
+IO_WORKERS = int(os.getenv("STOCK_API_IO_WORKERS", 16))
+IO_QUEUE_DEPTH = int(os.getenv("STOCK_API_IO_QUEUE", 64))
+RETRY_AFTER_SECONDS = int(os.getenv("STOCK_API_RETRY_AFTER", 5))
+LAZY_IMPORTS = os.getenv("STOCK_API_LAZY_IMPORTS", "1") != "0"
+WARMUP_TICKERS = os.getenv("STOCK_API_WARMUP_TICKERS", "")
+
+# Training (CPU-bound) runs in separate processes; "spawn" avoids forking
+# a process that already has threads running.
+cpu_pool = BoundedExecutor(
+    ProcessPoolExecutor(
+        max_workers=CPU_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+    ),
+    max_pending=CPU_WORKERS + CPU_QUEUE_DEPTH,
+)
+# Prediction and data fetching wait mostly on I/O and share the
+# in-process artifact and data caches, so they run on threads.
+io_pool = BoundedExecutor(
+    ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="api-io"),
+    max_pending=IO_WORKERS + IO_QUEUE_DEPTH,
+)
+
+
+# Training jobs run on the CPU pool and are recorded in SQLite; the
+# queue is created on startup so that importing this module has no
+# side effects on disk
+job_queue: Optional[JobQueue] = None
+
+
+def _predict_module():
+    """Import ``src.predict`` (and its heavy dependencies) on first use."""
+    from src import predict
+    return predict
+
+
+def _call_predict(name: str, *args, **kwargs):
+    """Call ``src.predict.<name>``; runs on a pool thread, import included."""
+    return getattr(_predict_module(), name)(*args, **kwargs)
+
+
+if not LAZY_IMPORTS:
+    _predict_module()
+
+
+def _busy() -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="Server is busy, please retry later.",
+        headers={"Retry-After": str(RETRY_AFTER_SECONDS)},
+    )
+
+
+async def run_in_pool(pool: BoundedExecutor, fn, *args, **kwargs):
+    """Run ``fn`` on ``pool`` without blocking the event loop (503 if full)."""
+    try:
+        future = pool.submit(fn, *args, **kwargs)
+    except Saturated:
+        raise _busy()
+    return await asyncio.wrap_future(future)
+
+
+# ---------------------------------------------------------------------------
+# Startup / Shutdown
+# ---------------------------------------------------------------------------
+warmup = {"state": "pending", "tickers": {}}
+
+
+def _warmup_tickers():
+    """Parse ``WARMUP_TICKERS``: None means every trained model."""
+    if WARMUP_TICKERS.strip() == "*":
+        return None
+    return [t.strip() for t in WARMUP_TICKERS.split(",") if t.strip()]
+
+
+async def _run_warmup() -> None:
+    tickers = _warmup_tickers()
+    if tickers == []:
+        warmup["state"] = "ready"
+        return
+
+    warmup["state"] = "warming_up"
+    try:
+        warmup["tickers"] = await run_in_pool(io_pool, _call_predict, "warm_up", tickers)
+    except Exception as exc:
+        logger.error("Warm-up failed: %s", exc, exc_info=True)
+        warmup["error"] = str(exc)
+    warmup["state"] = "ready"
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the job store, resume training jobs and start the warm-up; stop the pools on exit."""
+    global job_queue
+    job_queue = JobQueue(JobStore(), cpu_pool)
+    job_queue.recover()
+    warmup_task = asyncio.create_task(_run_warmup())
+    try:
+        yield
+    finally:
+        warmup_task.cancel()
+        cpu_pool.shutdown(wait=False, cancel_futures=True)
+        io_pool.shutdown(wait=False)
+
+
 # ---------------------------------------------------------------------------
 # App Setup
 # ---------------------------------------------------------------------------
@@ -40,6 +178,7 @@ app = FastAPI(
     title="Stock Price Prediction API",
     description="ML-powered stock price forecasting service",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # CORS — allow React dev server
@@ -60,10 +199,24 @@ class PredictRequest(BaseModel):
     days: int = Field(default=5, ge=1, le=30, description="Days ahead to predict")
 
 
+class BatchPredictRequest(BaseModel):
+    items: List[PredictRequest] = Field(
+        ..., min_length=1, max_length=500, description="Tickers and horizons to predict",
+    )
+
+
 class TrainRequest(BaseModel):
     ticker: str = Field(..., description="Stock ticker symbol", example="AAPL")
     period: str = Field(default="5y", description="Historical data period")
     tune: bool = Field(default=True, description="Run hyperparameter tuning")
+    horizon: Optional[int] = Field(
+        default=None, ge=1, le=30,
+        description="Train a direct multi-horizon model for this many days (default: recursive)",
+    )
+    incremental: bool = Field(
+        default=False,
+        description="Update the saved model with new bars; full refit only when drift is detected",
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -72,10 +225,34 @@ class TrainRequest(BaseModel):
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint."""
+    """Liveness check: the process is up and the event loop responsive."""
     return {"status": "healthy", "service": "stock-price-predictor"}
 
 
+@app.get("/ready")
+async def readiness_check():
+    """
+    Readiness check for load balancers.
+
+    Returns 503 while the startup warm-up is running and 200 once it has
+    finished; the body lists the per-ticker warm-up results.
+    """
+    if warmup["state"] != "ready":
+        return JSONResponse(status_code=503, content=warmup)
+    return warmup
+
+
+@app.get("/stats")
+async def stats():
+    """Cache hit/miss/eviction counters and executor occupancy for monitoring."""
+    stats = {"executors": {"cpu": cpu_pool.stats(), "io": io_pool.stats()}}
+    predict = sys.modules.get("src.predict")  # not loaded before the first prediction
+    if predict is not None:
+        stats["artifact_cache"] = predict.artifact_cache.stats()
+        stats["result_cache"] = predict.result_cache.stats()
+    return stats
+
+
 @app.post("/predict")
 async def predict(request: PredictRequest):
     """
@@ -89,8 +266,12 @@ async def predict(request: PredictRequest):
     """
     try:
         logger.info("Prediction request: ticker=%s, days=%d", request.ticker, request.days)
-        result = predict_stock(request.ticker, days_ahead=request.days)
+        result = await run_in_pool(
+            io_pool, _call_predict, "predict_stock", request.ticker, days_ahead=request.days,
+        )
         return result
+    except HTTPException:
+        raise
     except FileNotFoundError as exc:
         raise HTTPException(
             status_code=404,
@@ -103,33 +284,110 @@ async def predict(request: PredictRequest):
         raise HTTPException(status_code=500, detail=f"Prediction failed: {str(exc)}")
 
 
-@app.post("/train")
+def _error_status(exc: Exception) -> int:
+    """Map a prediction exception to the HTTP status /predict would return."""
+    if isinstance(exc, Saturated):
+        return 503
+    if isinstance(exc, FileNotFoundError):
+        return 404
+    if isinstance(exc, ValueError):
+        return 400
+    return 500
+
+
+@app.post("/predict/batch")
+async def predict_many(request: BatchPredictRequest):
+    """
+    Predict future prices for many tickers in one call.
+
+    Request body:
+        {"items": [{"ticker": "AAPL", "days": 5}, {"ticker": "MSFT", "days": 10}]}
+
+    Returns:
+        A newline-delimited JSON stream with one line per item, written as
+        soon as that ticker finishes.  Successful lines carry the same
+        fields as /predict plus "days"; failed lines carry "error" and
+        "status_code" (503 for tickers the busy I/O pool could not take).
+        Answers 503 with Retry-After when no ticker can start.
+    """
+    logger.info("Batch prediction request: %d items", len(request.items))
+    pairs = [(item.ticker, item.days) for item in request.items]
+
+    # The tickers run on the bounded I/O pool; 503 if none of them can start
+    try:
+        batch = await run_in_pool(io_pool, _call_predict, "predict_batch", pairs, executor=io_pool)
+    except Saturated:
+        raise _busy()
+
+    def stream():
+        for ticker, days, result, exc in batch:
+            if exc is None:
+                line = {**result, "days": days}
+            else:
+                line = {
+                    "ticker": ticker,
+                    "days": days,
+                    "error": str(exc),
+                    "status_code": _error_status(exc),
+                }
+            yield json.dumps(line) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+@app.post("/train", status_code=202)
 async def train(request: TrainRequest):
     """
-    Train or retrain a model for a ticker.
+    Queue a training job for a ticker.
 
     Request body:
-        {"ticker": "AAPL", "period": "5y", "tune": true}
+        {"ticker": "AAPL", "period": "5y", "tune": true, "horizon": 30, "incremental": false}
 
     Returns:
-        Training results and metrics for all models.
+        The job record (poll GET /jobs/{job_id} for progress and final
+        metrics).  "coalesced" is true when the ticker already had a
+        queued or running job with the same parameters and the request
+        joined it.
     """
     try:
         logger.info(
-            "Training request: ticker=%s, period=%s, tune=%s",
-            request.ticker, request.period, request.tune,
+            "Training request: ticker=%s, period=%s, tune=%s, horizon=%s, incremental=%s",
+            request.ticker, request.period, request.tune, request.horizon, request.incremental,
         )
-        result = train_model(
+        job, coalesced = await run_in_pool(
+            io_pool,
+            job_queue.submit,
             request.ticker,
             period=request.period,
             tune=request.tune,
+            horizon=request.horizon,
+            incremental=request.incremental,
+            n_jobs=TRAIN_N_JOBS,
         )
-        return result
-    except ValueError as exc:
-        raise HTTPException(status_code=400, detail=str(exc))
+        return {**job, "coalesced": coalesced}
+    except HTTPException:
+        raise
+    except Saturated:
+        raise _busy()
     except Exception as exc:
-        logger.error("Training failed: %s", exc, exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Training failed: {str(exc)}")
+        logger.error("Could not queue training: %s", exc, exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Could not queue training: {str(exc)}")
+
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    """
+    Status of a training job.
+
+    Returns:
+        {"job_id", "ticker", "params", "status" (queued | running |
+        succeeded | failed), "progress" (0-1), "stage", "result"
+        (train results once succeeded), "error", timestamps}
+    """
+    job = await run_in_pool(io_pool, job_queue.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job '{job_id}'.")
+    return job
 
 
 @app.get("/history/{ticker}")
@@ -144,8 +402,10 @@ async def history(ticker: str, days: int = 90):
         days — Number of recent trading days (default 90)
     """
     try:
-        data = get_historical_data(ticker, days=days)
+        data = await run_in_pool(io_pool, _call_predict, "get_historical_data", ticker, days=days)
         return {"ticker": ticker.upper(), "history": data}
+    except HTTPException:
+        raise
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc))
     except Exception as exc:
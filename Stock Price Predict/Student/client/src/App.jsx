@@ -20,6 +20,11 @@ import PredictionTable from "./components/PredictionTable";
 // API base URL — Vite proxy handles /api prefix in dev
 const API_BASE = "/api";
 
+// How often to poll a running training job
+const JOB_POLL_INTERVAL_MS = 2000;
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
 export default function App() {
   // ── State ────────────────────────────────────────────────────────────
   const [loading, setLoading] = useState(false);
@@ -64,7 +69,7 @@ export default function App() {
   };
 
   /**
-   * Handle training request
+   * Handle training request: queue a job, then poll until it finishes
    */
   const handleTrain = async (ticker) => {
     setTraining(true);
@@ -72,14 +77,25 @@ export default function App() {
     setStatusMsg(`Training model for ${ticker}... This may take 1-2 minutes.`);
 
     try {
-      const response = await axios.post(`${API_BASE}/train`, {
+      let { data: job } = await axios.post(`${API_BASE}/train`, {
         ticker,
         period: "5y",
         tune: true,
       });
 
-      setTrainResult(response.data);
-      setStatusMsg(`✅ Model trained for ${ticker}! Best model: ${response.data.best_model}`);
+      while (job.status === "queued" || job.status === "running") {
+        const pct = Math.round(job.progress * 100);
+        setStatusMsg(`Training model for ${ticker}... ${job.stage || job.status} (${pct}%)`);
+        await sleep(JOB_POLL_INTERVAL_MS);
+        ({ data: job } = await axios.get(`${API_BASE}/jobs/${job.job_id}`));
+      }
+
+      if (job.status === "failed") {
+        throw new Error(job.error || "Training failed.");
+      }
+
+      setTrainResult(job.result);
+      setStatusMsg(`✅ Model trained for ${ticker}! Best model: ${job.result.best_model}`);
 
       // Clear success message after 5 seconds
       setTimeout(() => setStatusMsg(null), 5000);
@@ -87,6 +103,7 @@ export default function App() {
       const msg =
         err.response?.data?.error ||
         err.response?.data?.detail ||
+        (!err.isAxiosError && err.message) ||
         "Training failed. Make sure the ML API is running.";
       setError(msg);
       setStatusMsg(null);
@@ -0,0 +1,106 @@
+"""
+float32_equivalence.py — float32 vs float64 Feature Path Check
+===============================================================
+Trains every candidate regression model twice on the same synthetic
+price series, once on float64 features and once on the float32 path
+(``prepare_features(..., dtype=np.float32)`` + ``scale_features(...,
+dtype=np.float32)``), and checks that the predictions agree.
+
+Trees compare float32 features in both cases, so only rounding in the
+float32 scaling can move a sample across a split; the linear model
+solves in float64 either way.
+
+Usage (from ``Stock Price Predict/Student``):
+    python scripts/float32_equivalence.py
+    python scripts/float32_equivalence.py --rows 5000 --seed 7
+
+Exits with status 1 if any model is outside the tolerances.
+
+Author : Student ML Engineer
+Project: Stock Price Prediction System
+"""
+
+import os
+import sys
+import argparse
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from src.features import add_all_technical_indicators, prepare_features, scale_features, time_based_split  # noqa: E402
+from src.train import _get_regression_models, compute_metrics  # noqa: E402
+
+RMSE_TOLERANCE = 0.01  # relative difference of test RMSE
+MEDIAN_TOLERANCE = 1e-4  # median relative difference of predictions
+
+
+def synthetic_ohlcv(rows: int, seed: int) -> pd.DataFrame:
+    """
+    Geometric random walk with plausible OHLCV columns.
+
+    Each bar opens with an overnight gap from the previous close and
+    drifts to its close; High and Low extend the open–close range by
+    independent amounts.  Close is therefore not a function of the other
+    columns of the same bar, and every model has a non-zero test error.
+    """
+    rng = np.random.default_rng(seed)
+    gap = rng.normal(0.0, 0.005, rows)
+    drift = rng.normal(0.0003, 0.014, rows)
+    close = 100 * np.exp(np.cumsum(gap + drift))
+    open_ = close * np.exp(-drift)
+    high = np.maximum(open_, close) * np.exp(np.abs(rng.normal(0, 0.006, rows)))
+    low = np.minimum(open_, close) * np.exp(-np.abs(rng.normal(0, 0.006, rows)))
+    return pd.DataFrame({
+        "Open": open_,
+        "High": high,
+        "Low": low,
+        "Close": close,
+        "Volume": rng.integers(1_000_000, 10_000_000, rows).astype(float),
+    }, index=pd.bdate_range("2000-01-03", periods=rows))
+
+
+def run(enriched: pd.DataFrame, dtype) -> tuple:
+    """Predictions of every model on the test split, plus the scaled train matrix."""
+    X, y = prepare_features(enriched, dtype=dtype)
+    X_train, X_test, y_train, y_test = time_based_split(X, y, test_ratio=0.2)
+    X_train_scaled, scaler = scale_features(X_train, dtype=dtype)
+    X_test_scaled, _ = scale_features(X_test, scaler=scaler, dtype=dtype)
+
+    preds = {}
+    for name, model in _get_regression_models(n_jobs=1).items():
+        model.fit(X_train_scaled, y_train)
+        preds[name] = np.asarray(model.predict(X_test_scaled))
+    return preds, y_test.to_numpy(), X_train_scaled
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2500, help="synthetic bars")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    enriched = add_all_technical_indicators(synthetic_ohlcv(args.rows, args.seed))
+    preds64, y_test, X64 = run(enriched, None)
+    preds32, _, X32 = run(enriched, np.float32)
+
+    print(f"Scaled training matrix: {X64.dtype} {X64.nbytes / 1e6:.2f} MB → "
+          f"{X32.dtype} {X32.nbytes / 1e6:.2f} MB (C-contiguous: {X32.flags['C_CONTIGUOUS']})")
+    print(f"\n  {'model':<20}{'rmse64':>10}{'rmse32':>10}{'median rel':>12}{'max rel':>10}")
+
+    failed = False
+    for name in preds64:
+        p64, p32 = preds64[name], preds32[name]
+        rel = np.abs(p32 - p64) / np.maximum(np.abs(p64), 1e-12)
+        rmse64 = compute_metrics(y_test, p64)["rmse"]
+        rmse32 = compute_metrics(y_test, p32)["rmse"]
+        ok = abs(rmse32 - rmse64) <= RMSE_TOLERANCE * rmse64 and np.median(rel) <= MEDIAN_TOLERANCE
+        failed |= not ok
+        print(f"  {name:<20}{rmse64:>10.4f}{rmse32:>10.4f}{np.median(rel):>12.2e}{rel.max():>10.2e}"
+              f"  {'✓' if ok else '✗'}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""
+import_time.py — Import-Time Benchmark
+=======================================
+Measures how long it takes to import a module in a fresh interpreter,
+using ``python -X importtime``, and lists the slowest imports.
+
+Usage (from ``Stock Price Predict/Student``):
+    python scripts/import_time.py                      # api.app, src.predict
+    python scripts/import_time.py src.train --top 20
+    python scripts/import_time.py predict_worker --path ../ML-Engineer/backend/python
+    python scripts/import_time.py api.app --max-ms 500  # exit 1 if slower
+
+Author : Student ML Engineer
+Project: Stock Price Prediction System
+"""
+
+import os
+import re
+import sys
+import argparse
+import subprocess
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_MODULES = ["api.app", "src.predict"]
+
+# "import time: self [us] | cumulative | imported package"
+_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure(module: str, paths: list, env: dict = None) -> list:
+    """
+    Import ``module`` in a new interpreter and parse ``-X importtime``.
+
+    Returns
+    -------
+    list of (name: str, self_us: int, cumulative_us: int, depth: int)
+        One entry per imported module, in import-completion order.
+    """
+    env = {**os.environ, **(env or {})}
+    env["PYTHONPATH"] = os.pathsep.join(paths + [env.get("PYTHONPATH", "")])
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        tail = "\n".join(proc.stderr.strip().splitlines()[-5:])
+        raise RuntimeError(f"Importing {module} failed:\n{tail}")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((name, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return rows
+
+
+def total_us(module: str, rows: list) -> int:
+    """Cumulative import time of ``module`` itself."""
+    return next(cum for name, _, cum, _ in reversed(rows) if name == module)
+
+
+def report(module: str, rows: list, top: int) -> float:
+    """Print a summary for ``module`` and return its total import time in ms."""
+    total_ms = total_us(module, rows) / 1000
+    print(f"\n{module}: {total_ms:.1f} ms total, {len(rows)} modules imported")
+
+    # Slowest top-level packages, by cumulative time
+    packages = {}
+    for name, _, cumulative_us, _ in rows:
+        root = name.split(".")[0]
+        if name == root and name != module:
+            packages[root] = max(packages.get(root, 0), cumulative_us)
+    print(f"  {'package':<32}{'cumulative ms':>14}")
+    for name, cumulative_us in sorted(packages.items(), key=lambda kv: -kv[1])[:top]:
+        print(f"  {name:<32}{cumulative_us / 1000:>14.1f}")
+    return total_ms
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES, help="modules to import")
+    parser.add_argument("--path", action="append", default=[], help="extra directory for PYTHONPATH")
+    parser.add_argument("--top", type=int, default=10, help="number of packages to list")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per module (best is reported)")
+    parser.add_argument("--max-ms", type=float, default=None, help="fail if any module is slower")
+    args = parser.parse_args()
+
+    paths = [PROJECT_ROOT] + [os.path.abspath(p) for p in args.path]
+    failed = False
+    for module in args.modules:
+        # Best of N runs smooths out disk-cache and scheduler noise
+        try:
+            runs = [measure(module, paths) for _ in range(args.repeat)]
+        except RuntimeError as exc:
+            print(f"\n{exc}")
+            failed = True
+            continue
+        best = min(runs, key=lambda rows: total_us(module, rows))
+        total_ms = report(module, best, args.top)
+        if args.max_ms is not None and total_ms > args.max_ms:
+            print(f"  ✗ {module} exceeds the {args.max_ms:.0f} ms budget")
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
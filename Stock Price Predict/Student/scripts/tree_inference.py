@@ -0,0 +1,94 @@
+"""
+tree_inference.py — Flat Tree Inference Check & Benchmark
+==========================================================
+Fits a DecisionTree and a RandomForest on synthetic data, compiles them
+with ``flatten_trees`` and checks that ``FlatTreeEnsemble.predict`` is
+bit-identical to ``model.predict`` on batches and single rows; then
+times single-row and batch latency of both.
+
+Usage (from ``Stock Price Predict/Student``):
+    python scripts/tree_inference.py
+    python scripts/tree_inference.py --trees 500 --rows 5000 --features 30
+
+Exits with status 1 if any prediction differs.
+
+Author : Student ML Engineer
+Project: Stock Price Prediction System
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from sklearn.ensemble import RandomForestRegressor  # noqa: E402
+from sklearn.tree import DecisionTreeRegressor  # noqa: E402
+
+from src.features import HAVE_NUMBA  # noqa: E402
+from src.model_store import flatten_trees  # noqa: E402
+
+
+def best_time(fn, repeat: int) -> float:
+    """Fastest of ``repeat`` calls, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2000, help="training rows")
+    parser.add_argument("--features", type=int, default=25)
+    parser.add_argument("--trees", type=int, default=200, help="RandomForest size")
+    parser.add_argument("--outputs", type=int, default=1, help="targets (>1 = multi-horizon)")
+    parser.add_argument("--repeat", type=int, default=50, help="timing runs (best is reported)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    X = rng.random((args.rows, args.features))
+    y = X @ rng.normal(size=(args.features, args.outputs)) + rng.normal(0, 0.1, (args.rows, args.outputs))
+    y = y[:, 0] if args.outputs == 1 else y
+    X_eval = rng.random((1000, args.features))
+
+    models = {
+        "DecisionTree": DecisionTreeRegressor(max_depth=10, random_state=42),
+        "RandomForest": RandomForestRegressor(n_estimators=args.trees, max_depth=15, random_state=42, n_jobs=1),
+    }
+    print(f"Flat inference kernel: {'numba' if HAVE_NUMBA else 'numpy'}")
+    print(f"\n  {'model':<14}{'identical':>10}{'sklearn 1 row':>16}{'flat 1 row':>14}"
+          f"{'sklearn 1k':>14}{'flat 1k':>12}")
+
+    failed = False
+    for name, model in models.items():
+        model.fit(X, y)
+        flat = flatten_trees(model)
+        flat.predict(X_eval[:1])  # compile the Numba kernel outside the timing
+
+        identical = np.array_equal(flat.predict(X_eval), model.predict(X_eval)) and all(
+            np.array_equal(flat.predict(X_eval[i:i + 1]), model.predict(X_eval[i:i + 1]))
+            for i in range(50)
+        )
+        failed |= not identical
+
+        row = X_eval[:1]
+        timings = [
+            best_time(lambda: model.predict(row), args.repeat),
+            best_time(lambda: flat.predict(row), args.repeat),
+            best_time(lambda: model.predict(X_eval), max(1, args.repeat // 5)),
+            best_time(lambda: flat.predict(X_eval), max(1, args.repeat // 5)),
+        ]
+        print(f"  {name:<14}{'✓' if identical else '✗':>10}"
+              f"{timings[0] * 1e6:>13.0f} µs{timings[1] * 1e6:>11.0f} µs"
+              f"{timings[2] * 1e3:>11.2f} ms{timings[3] * 1e3:>9.2f} ms")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
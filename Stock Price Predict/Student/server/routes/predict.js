@@ -16,6 +16,9 @@ const router = express.Router();
 // FastAPI ML service URL
 const ML_API_URL = process.env.ML_API_URL || "http://localhost:8000";
 
+// Timeout for short ML API calls (training runs as a background job)
+const ML_API_TIMEOUT_MS = parseInt(process.env.ML_API_TIMEOUT_MS || "10000");
+
 /**
  * POST /api/predict
  * Forward prediction request to FastAPI, save result to MongoDB.
@@ -68,27 +71,73 @@ router.post("/predict", async (req, res) => {
   }
 });
 
+/**
+ * POST /api/predict/batch
+ * Stream a multi-ticker prediction from FastAPI back to the client.
+ *
+ * Body: { items: [{ ticker: "AAPL", days: 5 }, ...] }
+ * Response: newline-delimited JSON, one line per item.
+ */
+router.post("/predict/batch", async (req, res) => {
+  try {
+    const { items } = req.body;
+
+    if (!Array.isArray(items) || items.length === 0) {
+      return res.status(400).json({ error: "A non-empty items list is required" });
+    }
+
+    const response = await axios.post(
+      `${ML_API_URL}/predict/batch`,
+      {
+        items: items.map(({ ticker, days = 5 }) => ({
+          ticker: String(ticker).toUpperCase(),
+          days: parseInt(days),
+        })),
+      },
+      { responseType: "stream" }
+    );
+
+    res.setHeader("Content-Type", "application/x-ndjson");
+    response.data.pipe(res);
+  } catch (error) {
+    console.error("Batch prediction error:", error.message);
+
+    if (error.response) {
+      return res.status(error.response.status).json({ error: "ML service error" });
+    }
+
+    res.status(500).json({
+      error: "ML service unavailable. Make sure FastAPI is running on port 8000.",
+    });
+  }
+});
+
 /**
  * POST /api/train
- * Forward training request to FastAPI.
+ * Queue a training job on FastAPI; returns the job record immediately.
  *
- * Body: { ticker: "AAPL", period: "5y", tune: true }
+ * Body: { ticker: "AAPL", period: "5y", tune: true, horizon: 30 }
  */
 router.post("/train", async (req, res) => {
   try {
-    const { ticker, period = "5y", tune = true } = req.body;
+    const { ticker, period = "5y", tune = true, horizon } = req.body;
 
     if (!ticker) {
       return res.status(400).json({ error: "Ticker symbol is required" });
     }
 
-    const response = await axios.post(`${ML_API_URL}/train`, {
-      ticker: ticker.toUpperCase(),
-      period,
-      tune,
-    });
+    const response = await axios.post(
+      `${ML_API_URL}/train`,
+      {
+        ticker: ticker.toUpperCase(),
+        period,
+        tune,
+        ...(horizon ? { horizon: parseInt(horizon) } : {}),
+      },
+      { timeout: ML_API_TIMEOUT_MS }
+    );
 
-    res.json(response.data);
+    res.status(response.status).json(response.data);
   } catch (error) {
     console.error("Training error:", error.response?.data || error.message);
 
@@ -104,6 +153,31 @@ router.post("/train", async (req, res) => {
   }
 });
 
+/**
+ * GET /api/jobs/:id
+ * Poll the status, progress and final metrics of a training job.
+ */
+router.get("/jobs/:id", async (req, res) => {
+  try {
+    const response = await axios.get(
+      `${ML_API_URL}/jobs/${encodeURIComponent(req.params.id)}`,
+      { timeout: ML_API_TIMEOUT_MS }
+    );
+
+    res.json(response.data);
+  } catch (error) {
+    console.error("Job status error:", error.response?.data || error.message);
+
+    if (error.response) {
+      return res.status(error.response.status).json({
+        error: error.response.data?.detail || "ML service error",
+      });
+    }
+
+    res.status(500).json({ error: "ML service unavailable." });
+  }
+});
+
 /**
  * GET /api/history/:ticker
  * Get recent historical data for charting.
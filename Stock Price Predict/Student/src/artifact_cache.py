@@ -0,0 +1,202 @@
+"""
+artifact_cache.py — In-Process Artifact Cache
+==============================================
+Bounded LRU cache for deserialized model artifacts.
+
+Entries are keyed by ticker and remember the (mtime, size) signature of
+the files they were loaded from.  A lookup re-stats those files — it
+never reads them — so artifacts rewritten by a new training run are
+picked up automatically while hot tickers are served from memory.
+
+The cache is bounded both by entry count and by the on-disk size of the
+cached files, which is a cheap proxy for their in-memory footprint.
+
+``TTLCache`` is a smaller sibling for computed results: entries carry
+an absolute expiry time and an optional file signature.
+
+Author : Student ML Engineer
+Project: Stock Price Prediction System
+"""
+
+import os
+import time
+import threading
+from collections import OrderedDict
+
+
+class ArtifactCache:
+    """
+    Thread-safe, size-aware LRU cache of loaded artifact bundles.
+
+    Parameters
+    ----------
+    max_entries : int
+        Maximum number of bundles kept in memory.
+    max_bytes : int
+        Maximum combined on-disk size of the cached bundles' files.
+    """
+
+    def __init__(self, max_entries: int = 32, max_bytes: int = 1 << 30):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (signature, nbytes, bundle)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _signature(paths: list) -> tuple:
+        """Return the (mtime_ns, size) of every file in ``paths``."""
+        stats = [os.stat(p) for p in paths]
+        return tuple((s.st_mtime_ns, s.st_size) for s in stats)
+
+    def get(self, key: str, paths: list, loader):
+        """
+        Return the bundle for ``key``, loading it with ``loader()`` if needed.
+
+        Parameters
+        ----------
+        key : str
+            Cache key (the normalised ticker).
+        paths : list of str
+            Files the bundle is loaded from; used for invalidation.
+        loader : callable
+            Zero-argument function that loads and returns the bundle.
+        """
+        signature = self._signature(paths)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] == signature:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[2]
+                # Files changed on disk (e.g. after retraining)
+                self._remove(key)
+                self.invalidations += 1
+            self.misses += 1
+
+        bundle = loader()
+        nbytes = sum(size for _, size in signature)
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if nbytes <= self.max_bytes:
+                self._entries[key] = (signature, nbytes, bundle)
+                self._bytes += nbytes
+                self._evict()
+        return bundle
+
+    def invalidate(self, key: str = None) -> None:
+        """Drop one entry, or every entry when ``key`` is None."""
+        with self._lock:
+            keys = list(self._entries) if key is None else [key]
+            for k in keys:
+                if k in self._entries:
+                    self._remove(k)
+                    self.invalidations += 1
+
+    def stats(self) -> dict:
+        """Return hit/miss/eviction counters and current occupancy."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    # ── Internal helpers (caller holds the lock) ─────────────────────────
+
+    def _remove(self, key: str) -> None:
+        _, nbytes, _ = self._entries.pop(key)
+        self._bytes -= nbytes
+
+    def _evict(self) -> None:
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            key = next(iter(self._entries))
+            self._remove(key)
+            self.evictions += 1
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries expire at a given time.
+
+    Entries may also be tied to files (as in ``ArtifactCache``) and are
+    dropped as soon as one of them changes.
+
+    Parameters
+    ----------
+    max_entries : int
+        Maximum number of entries kept.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires_at, signature, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, paths: list = (), signature: tuple = None):
+        """
+        Return the live value for ``key``, or None.
+
+        ``signature`` (see ``ArtifactCache._signature``) may be passed
+        instead of ``paths`` when the caller has already stat-ed the files.
+        """
+        if signature is None and paths:
+            signature = ArtifactCache._signature(paths)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now and entry[1] == signature:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value, expires_at: float, paths: list = (), signature: tuple = None) -> None:
+        """
+        Store ``value`` until the epoch time ``expires_at``.
+
+        Pass the ``signature`` the files had before ``value`` was computed
+        from them, so that a file replaced in the meantime invalidates it.
+        """
+        if signature is None and paths:
+            signature = ArtifactCache._signature(paths)
+        with self._lock:
+            self._entries[key] = (expires_at, signature, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and current occupancy."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
@@ -0,0 +1,374 @@
+"""
+backtest.py — Walk-Forward Backtesting
+=======================================
+Evaluates (ticker, model) combinations by rolling a train/test window
+across the whole price history instead of a single 80/20 split.
+
+  • refit       — every step fits a fresh model on its training window;
+                  steps are independent and run in parallel
+  • warm_start  — one Random Forest per ticker walks forward, adding
+                  ``trees_per_step`` trees fitted on each new window and
+                  dropping trees whose window has rolled out, then the
+                  oldest beyond ``max_trees``; each tree keeps the scaler
+                  of the window it was fitted on.  Other models are
+                  refitted per step as in refit mode; chains run in
+                  parallel
+
+Each ticker's feature matrix is built once (through the feature store)
+and shared by all of its steps; joblib memory-maps the arrays into the
+worker processes instead of copying them per fold.  Models use fixed
+seeds, so a run is reproducible, and every fold is reported with its
+dates and metrics.
+
+Usage (from ``Stock Price Predict/Student``):
+    python -m src.backtest AAPL MSFT --period 25y
+    python -m src.backtest AAPL --models RandomForest --mode warm_start --expanding
+    python -m src.backtest --tickers-file universe.txt --n-jobs 32 --name nightly
+
+Author : Student ML Engineer
+Project: Stock Price Prediction System
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+from src.data_fetch import fetch_stock_data
+from src.feature_store import feature_store
+from src.features import scale_features
+from src.train import INCREMENTAL_MAX_TREES, RANDOM_SEED, _get_regression_models, compute_metrics
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+BACKTEST_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "backtests")
+DEFAULT_MODELS = ["LinearRegression", "DecisionTree", "RandomForest"]
+TRAIN_DAYS = 252 * 5  # ≈ 5 trading years per training window
+TEST_DAYS = 63  # ≈ one quarter per test window
+TREES_PER_STEP = 50  # Random Forest growth per warm-start step
+MAX_TREES = INCREMENTAL_MAX_TREES  # warm-started forests drop their oldest trees beyond this
+
+logger = logging.getLogger(__name__)
+
+
+def walk_forward_windows(
+    n_rows: int,
+    train_days: int = TRAIN_DAYS,
+    test_days: int = TEST_DAYS,
+    step_days: int = None,
+    expanding: bool = False,
+) -> list:
+    """
+    Row ranges of the walk-forward steps.
+
+    Parameters
+    ----------
+    n_rows : int
+        Rows in the feature matrix.
+    train_days, test_days : int
+        Training-window and test-window lengths in rows (trading days).
+    step_days : int or None
+        How far the window moves per step (default: ``test_days``, so the
+        test windows tile the history without overlap).
+    expanding : bool
+        Keep every row since the start in the training window instead of
+        a rolling window of ``train_days``.
+
+    Returns
+    -------
+    list of (train_start, train_end, test_end) : tuple of int
+        Train on ``[train_start, train_end)``, test on ``[train_end, test_end)``.
+    """
+    step_days = step_days or test_days
+    windows = []
+    train_end = train_days
+    while train_end + test_days <= n_rows:
+        train_start = 0 if expanding else train_end - train_days
+        windows.append((train_start, train_end, train_end + test_days))
+        train_end += step_days
+    return windows
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# Fold Workers
+# ═══════════════════════════════════════════════════════════════════════════
+
+def _fold_row(ticker, model_name, fold, window, dates, y_test, preds, fit_seconds) -> dict:
+    train_start, train_end, test_end = window
+    return {
+        "ticker": ticker,
+        "model": model_name,
+        "fold": fold,
+        "train_start": str(dates[train_start].date()),
+        "train_end": str(dates[train_end - 1].date()),
+        "test_start": str(dates[train_end].date()),
+        "test_end": str(dates[test_end - 1].date()),
+        "n_train": train_end - train_start,
+        "n_test": test_end - train_end,
+        **compute_metrics(y_test, preds),
+        "fit_seconds": round(fit_seconds, 3),
+    }
+
+
+def _run_fold(ticker, model_name, fold, window, X, y, dates) -> dict:
+    """Fit a fresh model on one training window and score its test window."""
+    train_start, train_end, test_end = window
+    X_train, scaler = scale_features(X[train_start:train_end])
+    X_test, _ = scale_features(X[train_end:test_end], scaler=scaler)
+
+    model = _get_regression_models(n_jobs=1)[model_name]
+    started = time.perf_counter()
+    model.fit(X_train, y[train_start:train_end])
+    fit_seconds = time.perf_counter() - started
+
+    preds = model.predict(X_test)
+    return _fold_row(ticker, model_name, fold, window, dates, y[train_end:test_end], preds, fit_seconds)
+
+
+def _warm_startable(model_name: str) -> bool:
+    """True for models that can grow by warm start (the Random Forest)."""
+    params = _get_regression_models(n_jobs=1)[model_name].get_params()
+    return "warm_start" in params and "n_estimators" in params
+
+
+def _predict_trees(trees, origins, X) -> np.ndarray:
+    """Average of ``trees``, each fed ``X`` scaled like the window it was fitted on."""
+    scaled = {}
+    total = 0.0
+    for tree, (scaler, _) in zip(trees, origins):
+        if id(scaler) not in scaled:
+            scaled[id(scaler)], _ = scale_features(X, scaler=scaler)
+        total = total + tree.predict(scaled[id(scaler)])
+    return total / len(trees)
+
+
+def _run_chain(ticker, model_name, windows, X, y, dates, trees_per_step, max_trees) -> list:
+    """Walk one forest forward through every window, warm-starting it."""
+    model = _get_regression_models(n_jobs=1)[model_name]
+    model.set_params(warm_start=True)
+    budget = max(0, max_trees - trees_per_step)  # old trees kept per step
+
+    # (scaler, train_end) of the window each tree in model.estimators_ was fitted on
+    origins = []
+    rows = []
+    for fold, window in enumerate(windows):
+        train_start, train_end, test_end = window
+        if fold > 0:
+            # Drop trees whose training rows have all left the window, then the oldest
+            keep = [i for i, (_, end) in enumerate(origins) if end > train_start]
+            keep = keep[len(keep) - budget:] if len(keep) > budget else keep
+            model.estimators_ = [model.estimators_[i] for i in keep]
+            origins = [origins[i] for i in keep]
+            model.set_params(n_estimators=len(keep) + trees_per_step)
+
+        # New trees see this window's scaling; the kept ones keep their own
+        X_train, scaler = scale_features(X[train_start:train_end])
+        started = time.perf_counter()
+        model.fit(X_train, y[train_start:train_end])
+        fit_seconds = time.perf_counter() - started
+        origins += [(scaler, train_end)] * (len(model.estimators_) - len(origins))
+
+        preds = _predict_trees(model.estimators_, origins, X[train_end:test_end])
+        rows.append(_fold_row(ticker, model_name, fold, window, dates, y[train_end:test_end], preds, fit_seconds))
+    return rows
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# Backtest Runner
+# ═══════════════════════════════════════════════════════════════════════════
+
+def load_matrix(ticker: str, period: str = "25y") -> tuple:
+    """
+    Feature matrix of a ticker, built once for all walk-forward steps.
+
+    Indicators come from the feature store, so rows at the start of
+    ``period`` are warmed up by any longer history stored for the ticker.
+
+    Returns
+    -------
+    tuple of (X: np.ndarray, y: np.ndarray, dates: pd.DatetimeIndex)
+    """
+    df = fetch_stock_data(ticker, period=period)
+    X, y = feature_store.features(ticker, df, target_col="Close")
+    return X.to_numpy(dtype=np.float64), y.to_numpy(dtype=np.float64), X.index
+
+
+def summarize(results: pd.DataFrame) -> pd.DataFrame:
+    """Mean fold metrics per (ticker, model), plus the fold count."""
+    metrics = ["rmse", "mae", "mape", "directional_accuracy", "fit_seconds"]
+    summary = results.groupby(["ticker", "model"])[metrics].mean().round(4)
+    summary["folds"] = results.groupby(["ticker", "model"]).size()
+    return summary.reset_index()
+
+
+def run_backtest(
+    tickers: list,
+    models: list = None,
+    period: str = "25y",
+    train_days: int = TRAIN_DAYS,
+    test_days: int = TEST_DAYS,
+    step_days: int = None,
+    expanding: bool = False,
+    mode: str = "refit",
+    trees_per_step: int = TREES_PER_STEP,
+    max_trees: int = MAX_TREES,
+    n_jobs: int = -1,
+    name: str = None,
+) -> pd.DataFrame:
+    """
+    Walk-forward backtest of every (ticker, model) combination.
+
+    Parameters
+    ----------
+    tickers : list of str
+        Tickers to evaluate.
+    models : list of str or None
+        Names from ``train._get_regression_models`` (default: all).
+    period : str
+        yfinance history period.
+    train_days, test_days, step_days, expanding
+        Window layout (see ``walk_forward_windows``).
+    mode : str
+        "refit" or "warm_start" (see the module docstring).
+    trees_per_step : int
+        Random Forest trees added per warm-start step.
+    max_trees : int
+        Largest warm-started forest; the oldest trees are dropped beyond it.
+    n_jobs : int
+        Parallel fold (or chain) workers; every model fits on one core.
+    name : str or None
+        If set, write ``data/backtests/<name>.csv`` (fold metrics) and
+        ``<name>.json`` (configuration and summary).
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per (ticker, model, fold) with dates and metrics.
+    """
+    from joblib import Parallel, delayed
+
+    if mode not in ("refit", "warm_start"):
+        raise ValueError(f"Unknown backtest mode {mode!r}; use 'refit' or 'warm_start'.")
+    models = models or DEFAULT_MODELS
+    unknown = set(models) - set(_get_regression_models())
+    if unknown:
+        raise ValueError(f"Unknown models: {sorted(unknown)}")
+
+    tasks = []
+    for ticker in dict.fromkeys(t.upper() for t in tickers):
+        try:
+            X, y, dates = load_matrix(ticker, period)
+        except Exception as exc:
+            logger.error("Skipping %s: %s", ticker, exc)
+            continue
+        windows = walk_forward_windows(len(X), train_days, test_days, step_days, expanding)
+        if not windows:
+            logger.warning("Skipping %s: %d rows is too short for one step", ticker, len(X))
+            continue
+        logger.info("%s: %d rows, %d walk-forward steps", ticker, len(X), len(windows))
+
+        for model_name in models:
+            if mode == "warm_start" and _warm_startable(model_name):
+                tasks.append(delayed(_run_chain)(
+                    ticker, model_name, windows, X, y, dates, trees_per_step, max_trees,
+                ))
+            else:
+                tasks += [
+                    delayed(_run_fold)(ticker, model_name, fold, window, X, y, dates)
+                    for fold, window in enumerate(windows)
+                ]
+
+    started = time.monotonic()
+    outputs = Parallel(n_jobs=n_jobs)(tasks)
+    # Chains return a list of fold rows, single folds one row
+    rows = [row for out in outputs for row in (out if isinstance(out, list) else [out])]
+    results = pd.DataFrame(rows)
+    logger.info("Backtest finished: %d folds in %.1fs", len(results), time.monotonic() - started)
+
+    if name and not results.empty:
+        import sklearn
+
+        os.makedirs(BACKTEST_DIR, exist_ok=True)
+        results.to_csv(os.path.join(BACKTEST_DIR, f"{name}.csv"), index=False)
+        config = {
+            "tickers": sorted(results["ticker"].unique().tolist()),
+            "models": models,
+            "period": period,
+            "train_days": train_days,
+            "test_days": test_days,
+            "step_days": step_days or test_days,
+            "expanding": expanding,
+            "mode": mode,
+            "trees_per_step": trees_per_step,
+            "max_trees": max_trees,
+            "random_seed": RANDOM_SEED,
+            "sklearn_version": sklearn.__version__,
+            "created_at": datetime.now().isoformat(),
+        }
+        with open(os.path.join(BACKTEST_DIR, f"{name}.json"), "w") as fh:
+            json.dump({"config": config, "summary": summarize(results).to_dict("records")}, fh, indent=2)
+
+    return results
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# CLI
+# ═══════════════════════════════════════════════════════════════════════════
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("tickers", nargs="*", help="tickers to evaluate")
+    parser.add_argument("--tickers-file", help="file with one ticker per line (# comments allowed)")
+    parser.add_argument("--models", nargs="+", default=None, help=f"models (default: {' '.join(DEFAULT_MODELS)})")
+    parser.add_argument("--period", default="25y", help="yfinance history period")
+    parser.add_argument("--train-days", type=int, default=TRAIN_DAYS)
+    parser.add_argument("--test-days", type=int, default=TEST_DAYS)
+    parser.add_argument("--step-days", type=int, default=None)
+    parser.add_argument("--expanding", action="store_true", help="expanding instead of rolling training window")
+    parser.add_argument("--mode", choices=["refit", "warm_start"], default="refit")
+    parser.add_argument("--trees-per-step", type=int, default=TREES_PER_STEP)
+    parser.add_argument("--max-trees", type=int, default=MAX_TREES, help="warm-started forest size cap")
+    parser.add_argument("--n-jobs", type=int, default=-1, help="parallel workers (-1 = all cores)")
+    parser.add_argument("--name", default=None, help="write data/backtests/<name>.csv and .json")
+    args = parser.parse_args()
+
+    tickers = list(args.tickers)
+    if args.tickers_file:
+        with open(args.tickers_file) as fh:
+            for line in fh:
+                line = line.split("#", 1)[0].strip()
+                if line:
+                    tickers.append(line)
+    if not tickers:
+        parser.error("no tickers given")
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    results = run_backtest(
+        tickers,
+        models=args.models,
+        period=args.period,
+        train_days=args.train_days,
+        test_days=args.test_days,
+        step_days=args.step_days,
+        expanding=args.expanding,
+        mode=args.mode,
+        trees_per_step=args.trees_per_step,
+        max_trees=args.max_trees,
+        n_jobs=args.n_jobs,
+        name=args.name,
+    )
+    if results.empty:
+        print("No folds were run.")
+        return 1
+    print(summarize(results).to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,306 @@
+"""
+batch_train.py — Multi-Ticker Training Orchestrator
+====================================================
+Trains a whole ticker universe (e.g. the nightly retrain) on one machine
+without oversubscribing its cores.
+
+A fixed CPU budget is split between tickers running side by side and
+the estimators inside each of them: every ticker is trained in its own
+process with ``train_model(..., n_jobs=k)`` and BLAS/OpenMP thread pools
+limited to ``k``, and the scheduler only starts another ticker while
+cores are free.  Near the end of a run, when fewer tickers are left
+than slots, the remaining tickers get the freed cores.
+
+Progress is checkpointed to a JSON file after every ticker; if a run is
+interrupted or some tickers fail, running the same command again skips
+the tickers that already succeeded and retries the rest.  A run that
+finishes without failures deletes its checkpoint, so the next run (e.g.
+the following night) trains every ticker again.
+
+Usage (from ``Stock Price Predict/Student``):
+    python -m src.batch_train AAPL MSFT GOOGL --period 5y
+    python -m src.batch_train --tickers-file universe.txt --cores 32 --jobs-per-ticker 4
+    python -m src.batch_train --tickers-file universe.txt --fresh   # ignore the checkpoint
+    python -m src.batch_train --tickers-file universe.txt --incremental  # daily update
+
+Author : Student ML Engineer
+Project: Stock Price Prediction System
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+CHECKPOINT_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "train_runs")
+DEFAULT_JOBS_PER_TICKER = 4  # cores per ticker while many tickers are queued
+
+logger = logging.getLogger(__name__)
+
+
+def available_cores() -> int:
+    """Cores this process may run on (respects CPU affinity / cgroups pinning)."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# Checkpoint
+# ═══════════════════════════════════════════════════════════════════════════
+
+class Checkpoint:
+    """
+    JSON record of a training run: its parameters and the outcome of
+    every finished ticker.
+
+    Parameters
+    ----------
+    path : str
+        Checkpoint file; loaded if it exists.
+    params : dict
+        Training parameters of this run.  A checkpoint written with
+        different parameters is not resumed.
+    fresh : bool
+        Ignore any existing checkpoint.
+    """
+
+    def __init__(self, path: str, params: dict, fresh: bool = False):
+        self.path = path
+        self.state = {"params": params, "completed": {}, "failed": {}}
+
+        if not fresh and os.path.exists(path):
+            with open(path) as fh:
+                stored = json.load(fh)
+            if stored.get("params") == params:
+                self.state = stored
+                # Failed tickers are retried
+                self.state["failed"] = {}
+            else:
+                logger.warning("Checkpoint %s was written with other parameters; starting over", path)
+
+    def done(self, ticker: str) -> bool:
+        return ticker in self.state["completed"]
+
+    def record(self, ticker: str, result: dict = None, error: str = None) -> None:
+        """Record one ticker's outcome and write the file atomically."""
+        if error is None:
+            self.state["completed"][ticker] = {
+                "best_model": result["best_model"],
+                "best_metrics": result["best_metrics"],
+                "retrain": result.get("retrain", "full"),
+                "finished_at": datetime.now().isoformat(),
+            }
+        else:
+            self.state["failed"][ticker] = error
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as fh:
+            json.dump(self.state, fh, indent=2, default=float)
+        os.replace(tmp_path, self.path)
+
+    def clear(self) -> None:
+        """Delete the checkpoint file once its run has finished."""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# Worker
+# ═══════════════════════════════════════════════════════════════════════════
+
+def _train_one(ticker: str, params: dict, n_jobs: int) -> dict:
+    """
+    Train one ticker on ``n_jobs`` cores.
+
+    Top-level so that it can be pickled into a process pool.
+    """
+    from src.train import train_model
+
+    try:
+        from threadpoolctl import threadpool_limits  # installed with scikit-learn
+    except ImportError:
+        return train_model(ticker, n_jobs=n_jobs, **params)
+
+    # NumPy/BLAS and OpenMP would otherwise start one thread per core
+    with threadpool_limits(limits=n_jobs):
+        return train_model(ticker, n_jobs=n_jobs, **params)
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# Scheduler
+# ═══════════════════════════════════════════════════════════════════════════
+
+def train_universe(
+    tickers: list,
+    period: str = "5y",
+    tune: bool = True,
+    horizon: int = None,
+    incremental: bool = False,
+    cores: int = None,
+    jobs_per_ticker: int = DEFAULT_JOBS_PER_TICKER,
+    checkpoint_path: str = None,
+    fresh: bool = False,
+) -> dict:
+    """
+    Train every ticker in ``tickers`` within a budget of ``cores``.
+
+    Parameters
+    ----------
+    tickers : list of str
+        Ticker universe; duplicates are ignored.
+    period, tune, horizon, incremental
+        Passed to ``train_model`` for every ticker.
+    cores : int or None
+        Total CPU budget (default: all available cores).
+    jobs_per_ticker : int
+        Cores given to each ticker while more tickers are waiting than
+        there are slots; tickers started at the tail of the run get more.
+    checkpoint_path : str or None
+        Checkpoint file (default: ``data/train_runs/universe.json``).
+    fresh : bool
+        Ignore an existing checkpoint and retrain everything.
+
+    The checkpoint is deleted when every ticker succeeded, so it only
+    resumes runs that were interrupted or had failures.
+
+    Returns
+    -------
+    dict
+        {"completed": {ticker: summary}, "failed": {ticker: error},
+         "skipped": int, "elapsed_seconds": float}
+    """
+    cores = max(1, cores or available_cores())
+    jobs_per_ticker = max(1, min(jobs_per_ticker, cores))
+    params = {"period": period, "tune": tune, "horizon": horizon, "incremental": incremental}
+    checkpoint = Checkpoint(
+        checkpoint_path or os.path.join(CHECKPOINT_DIR, "universe.json"),
+        params,
+        fresh=fresh,
+    )
+
+    universe = list(dict.fromkeys(t.upper() for t in tickers))
+    pending = [t for t in universe if not checkpoint.done(t)]
+    skipped = len(universe) - len(pending)
+    if skipped:
+        logger.info("Resuming: %d of %d tickers already trained", skipped, len(universe))
+
+    slots = max(1, cores // jobs_per_ticker)
+    logger.info(
+        "Training %d tickers on %d cores (%d at a time, %d cores each)",
+        len(pending), cores, min(slots, len(pending)), jobs_per_ticker,
+    )
+
+    started = time.monotonic()
+    running = {}  # future -> (ticker, cores)
+    free = cores
+    finished = 0
+
+    with ProcessPoolExecutor(
+        max_workers=min(slots, max(1, len(pending))),
+        mp_context=multiprocessing.get_context("spawn"),
+    ) as pool:
+        while pending or running:
+            # Start tickers while cores are free; share them out evenly
+            # among the tickers that can still start
+            while pending and free >= jobs_per_ticker and len(running) < slots:
+                startable = min(len(pending), slots - len(running))
+                n_jobs = max(jobs_per_ticker, free // startable)
+                ticker = pending.pop(0)
+                future = pool.submit(_train_one, ticker, params, n_jobs)
+                running[future] = (ticker, n_jobs)
+                free -= n_jobs
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                ticker, n_jobs = running.pop(future)
+                free += n_jobs
+                finished += 1
+                try:
+                    result = future.result()
+                except Exception as exc:
+                    logger.error("Training %s failed: %s", ticker, exc)
+                    checkpoint.record(ticker, error=str(exc))
+                else:
+                    checkpoint.record(ticker, result=result)
+
+                elapsed = time.monotonic() - started
+                remaining = len(pending) + len(running)
+                eta = elapsed / finished * remaining
+                logger.info(
+                    "[%d/%d] %s done — %.0fs elapsed, ~%.0fs remaining",
+                    finished, finished + remaining, ticker, elapsed, eta,
+                )
+
+    if not checkpoint.state["failed"]:
+        checkpoint.clear()
+
+    return {
+        "completed": checkpoint.state["completed"],
+        "failed": checkpoint.state["failed"],
+        "skipped": skipped,
+        "elapsed_seconds": round(time.monotonic() - started, 1),
+    }
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# CLI
+# ═══════════════════════════════════════════════════════════════════════════
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("tickers", nargs="*", help="tickers to train")
+    parser.add_argument("--tickers-file", help="file with one ticker per line (# comments allowed)")
+    parser.add_argument("--period", default="5y", help="yfinance history period")
+    parser.add_argument("--no-tune", action="store_true", help="skip Random Forest tuning")
+    parser.add_argument("--horizon", type=int, default=None, help="train direct multi-horizon models")
+    parser.add_argument("--incremental", action="store_true",
+                        help="update saved models with new bars; full refit only on drift")
+    parser.add_argument("--cores", type=int, default=None, help="total CPU budget (default: all)")
+    parser.add_argument("--jobs-per-ticker", type=int, default=DEFAULT_JOBS_PER_TICKER,
+                        help="cores per ticker while the queue is long")
+    parser.add_argument("--checkpoint", default=None, help="checkpoint file to write and resume from")
+    parser.add_argument("--fresh", action="store_true", help="ignore an existing checkpoint")
+    args = parser.parse_args()
+
+    tickers = list(args.tickers)
+    if args.tickers_file:
+        with open(args.tickers_file) as fh:
+            for line in fh:
+                line = line.split("#", 1)[0].strip()
+                if line:
+                    tickers.append(line)
+    if not tickers:
+        parser.error("no tickers given")
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    summary = train_universe(
+        tickers,
+        period=args.period,
+        tune=not args.no_tune,
+        horizon=args.horizon,
+        incremental=args.incremental,
+        cores=args.cores,
+        jobs_per_ticker=args.jobs_per_ticker,
+        checkpoint_path=args.checkpoint,
+        fresh=args.fresh,
+    )
+
+    print(f"\nTrained {len(summary['completed'])} tickers "
+          f"({summary['skipped']} from checkpoint) in {summary['elapsed_seconds']:.0f}s")
+    for ticker, error in summary["failed"].items():
+        print(f"  ✗ {ticker}: {error}")
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
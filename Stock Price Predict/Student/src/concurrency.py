@@ -0,0 +1,163 @@
+"""
+concurrency.py — Concurrency Helpers
+=====================================
+Small thread-safe primitives shared by the data and prediction modules.
+
+  • TokenBucket  — blocking rate limiter for upstream API calls
+  • SingleFlight — coalesces concurrent calls with the same key
+  • BoundedExecutor — executor wrapper that rejects work when saturated
+
+Author : Student ML Engineer
+Project: Stock Price Prediction System
+"""
+
+import time
+import threading
+from concurrent.futures import Future
+
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter.
+
+    Parameters
+    ----------
+    rate : float
+        Tokens added per second (sustained calls per second).
+    capacity : float
+        Maximum number of tokens (allowed burst size).
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        """Block until ``tokens`` are available, then consume them."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class SingleFlight:
+    """
+    Run at most one call per key at a time; concurrent callers with the
+    same key wait for and share the leader's result (or exception).
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, *args, **kwargs) -> tuple:
+        """
+        Call ``fn(*args, **kwargs)`` unless a call for ``key`` is in flight.
+
+        Returns
+        -------
+        tuple of (result, shared: bool)
+            ``shared`` is True when the result came from another caller's
+            in-flight call.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+
+        if not leader:
+            return future.result(), True
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def in_flight(self) -> int:
+        """Number of keys currently being computed."""
+        with self._lock:
+            return len(self._calls)
+
+
+class Saturated(RuntimeError):
+    """Raised when a ``BoundedExecutor`` has no free slot for new work."""
+
+
+class BoundedExecutor:
+    """
+    Wrap an executor so that at most ``max_pending`` tasks (running plus
+    queued) exist at once; further submissions fail fast with
+    ``Saturated`` instead of queueing without bound.
+
+    Parameters
+    ----------
+    executor : concurrent.futures.Executor
+        Pool the tasks run on.
+    max_pending : int
+        Worker count plus the allowed queue depth.
+    """
+
+    def __init__(self, executor, max_pending: int):
+        self.max_pending = max_pending
+        self._executor = executor
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.submitted = 0
+        self.rejected = 0
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        """Schedule ``fn(*args, **kwargs)``; raise ``Saturated`` if full."""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise Saturated(f"All {self.max_pending} slots are busy.")
+
+        try:
+            future = self._executor.submit(fn, *args, **kwargs)
+        except BaseException:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self.pending += 1
+            self.submitted += 1
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, _future) -> None:
+        with self._lock:
+            self.pending -= 1
+        self._slots.release()
+
+    def stats(self) -> dict:
+        """Return occupancy and submission counters."""
+        with self._lock:
+            return {
+                "pending": self.pending,
+                "max_pending": self.max_pending,
+                "submitted": self.submitted,
+                "rejected": self.rejected,
+            }
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False) -> None:
+        """Shut down the wrapped executor (see ``Executor.shutdown``)."""
+        self._executor.shutdown(wait=wait, cancel_futures=cancel_futures)
@@ -2,51 +2,428 @@
 data_fetch.py — Stock Data Fetching & Caching Module
 =====================================================
 Fetches historical stock data from Yahoo Finance via yfinance.
-Implements local CSV caching and retry logic for API failures.
+Implements local caching and retry logic for API failures.
+
+Upstream calls go through a shared token-bucket rate limiter and retry
+with jittered exponential back-off.  Concurrent requests for the same
+data are coalesced into one download, and ``fetch_many`` refreshes a
+whole ticker universe on a bounded thread pool.  The upstream source can
+be swapped with ``set_data_provider`` (e.g. a local stub for offline use).
+
+Cache backends (selected with ``CACHE_FORMAT`` or the ``cache_format``
+argument):
+  • csv     — plain text, always available
+  • parquet — compressed columnar storage (requires pyarrow)
+  • arrow   — uncompressed Arrow IPC, memory-mapped on read (requires pyarrow)
+
+Each ticker has one canonical cache file holding the longest history
+fetched so far; shorter periods are served by slicing it by date, and
+the decoded frame is shared in memory between callers.  Every cache file
+has a JSON sidecar (``<file>.meta.json``) recording the ticker, the
+period it covers, row count, date range, timezone and fetch time.
 
 Author : Student ML Engineer
 Project: Stock Price Prediction System
 """
 
 import os
+import re
+import json
 import time
+import random
 import logging
+import numpy as np
 import pandas as pd
-import yfinance as yf
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 
+from src.artifact_cache import ArtifactCache
+from src.concurrency import SingleFlight, TokenBucket
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+
 # ---------------------------------------------------------------------------
 # Configuration
 # ---------------------------------------------------------------------------
 CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
 MAX_RETRIES = 3
-RETRY_DELAY = 2  # seconds
-CACHE_EXPIRY_HOURS = 6  # re-download if cache is older than this
+RETRY_DELAY = 2  # seconds, base of the exponential back-off
+MAX_RETRY_DELAY = 30  # seconds
+RATE_LIMIT_PER_SEC = 2.0  # sustained upstream requests per second
+RATE_LIMIT_BURST = 5
+BULK_MAX_WORKERS = 8  # thread pool size for fetch_many
+CACHE_EXPIRY_HOURS = 6  # refresh if cache is older than this
+DELTA_OVERLAP_DAYS = 7  # re-fetch this many days before the last cached bar
+DELTA_PRICE_RTOL = 1e-4  # overlap mismatch tolerance before a full re-download
+MEMORY_CACHE_MAX_TICKERS = 64  # decoded histories kept in memory
+MEMORY_CACHE_MAX_BYTES = 512 << 20
+CACHE_FORMAT = os.getenv("STOCK_CACHE_FORMAT", "parquet" if pa is not None else "csv")
+
+# Column types for the binary backends; prices are stored as float32
+# (yfinance quotes are float32 precision already) and widened back to
+# float64 on read.
+PRICE_COLUMNS = ["Open", "High", "Low", "Close", "Adj Close"]
+VOLUME_COLUMN = "Volume"
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 logger = logging.getLogger(__name__)
 
+# Decoded cache files, keyed by path and invalidated when the file changes
+_frame_cache = ArtifactCache(
+    max_entries=MEMORY_CACHE_MAX_TICKERS,
+    max_bytes=MEMORY_CACHE_MAX_BYTES,
+)
+_rate_limiter = TokenBucket(RATE_LIMIT_PER_SEC, RATE_LIMIT_BURST)
+_in_flight = SingleFlight()
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# Data Provider
+# ═══════════════════════════════════════════════════════════════════════════
+
+def _yfinance_history(ticker: str, **history_kwargs) -> pd.DataFrame:
+    """Default provider: unadjusted OHLCV history from Yahoo Finance."""
+    import yfinance as yf  # deferred: only needed when downloading
+    return yf.Ticker(ticker).history(auto_adjust=False, **history_kwargs)
+
+
+_provider = _yfinance_history
+
+
+def set_data_provider(provider=None) -> None:
+    """
+    Replace the upstream data source (None restores yfinance).
+
+    ``provider(ticker, **kwargs)`` must return an OHLCV DataFrame indexed
+    by date and accept the ``yf.Ticker.history`` keywords ``period`` or
+    ``start``.
+    """
+    global _provider
+    _provider = provider or _yfinance_history
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# Cache Backends
+# ═══════════════════════════════════════════════════════════════════════════
+
+def _to_storage_types(df: pd.DataFrame) -> pd.DataFrame:
+    """Cast OHLCV columns to their compact on-disk types."""
+    df = df.copy()
+    for col in PRICE_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("float32")
+    if VOLUME_COLUMN in df.columns:
+        df[VOLUME_COLUMN] = df[VOLUME_COLUMN].astype("int64")
+    return df
+
+
+def _from_storage_types(df: pd.DataFrame) -> pd.DataFrame:
+    """Widen price columns back to float64 for feature engineering."""
+    for col in PRICE_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("float64")
+    return df
+
+
+class CsvBackend:
+    """Plain CSV cache (the original format)."""
+
+    extension = ".csv"
+
+    def write(self, df: pd.DataFrame, path: str) -> None:
+        df.to_csv(path)
+
+    def normalize(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Values as a later ``read`` returns them (CSV keeps float64)."""
+        return df
+
+    def read(self, path: str, tz: str = None) -> pd.DataFrame:
+        df = pd.read_csv(path, index_col="Date")
+        # Offsets change across DST, so parse as UTC and convert back
+        df.index = pd.to_datetime(df.index, utc=True)
+        if tz:
+            df.index = df.index.tz_convert(tz)
+        df.index.name = "Date"
+        return df
+
+
+class ParquetBackend:
+    """Compressed columnar cache."""
+
+    extension = ".parquet"
+
+    def write(self, df: pd.DataFrame, path: str) -> None:
+        _to_storage_types(df).to_parquet(path, engine="pyarrow")
+
+    def normalize(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Values as a later ``read`` returns them (prices rounded to float32)."""
+        return _from_storage_types(_to_storage_types(df))
+
+    def read(self, path: str, tz: str = None) -> pd.DataFrame:
+        return pd.read_parquet(path, engine="pyarrow")
+
+
+class ArrowBackend:
+    """Uncompressed Arrow IPC cache, read through a memory map."""
+
+    extension = ".arrow"
+
+    def write(self, df: pd.DataFrame, path: str) -> None:
+        table = pa.Table.from_pandas(_to_storage_types(df), preserve_index=True)
+        feather.write_feather(table, path, compression="uncompressed")
+
+    def normalize(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Values as a later ``read`` returns them (prices rounded to float32)."""
+        return _from_storage_types(_to_storage_types(df))
+
+    def read(self, path: str, tz: str = None) -> pd.DataFrame:
+        return feather.read_table(path, memory_map=True).to_pandas()
 
-def _get_cache_path(ticker: str, period: str) -> str:
-    """Generate a cache file path for the given ticker and period."""
+
+CACHE_BACKENDS = {
+    "csv": CsvBackend,
+    "parquet": ParquetBackend,
+    "arrow": ArrowBackend,
+}
+
+
+def get_cache_backend(name: str = None):
+    """
+    Return a cache backend instance by name (defaults to ``CACHE_FORMAT``).
+
+    Raises
+    ------
+    ValueError
+        If the name is unknown or the backend needs pyarrow and it is
+        not installed.
+    """
+    name = (name or CACHE_FORMAT).lower()
+    if name not in CACHE_BACKENDS:
+        raise ValueError(
+            f"Unknown cache format '{name}'. Choose from {sorted(CACHE_BACKENDS)}."
+        )
+    if name != "csv" and pa is None:
+        raise ValueError(f"Cache format '{name}' requires pyarrow to be installed.")
+    return CACHE_BACKENDS[name]()
+
+
+def _get_cache_path(ticker: str, backend=None) -> str:
+    """Generate the canonical cache file path for a ticker and backend."""
+    backend = backend or get_cache_backend()
     os.makedirs(CACHE_DIR, exist_ok=True)
     safe_ticker = ticker.upper().replace("/", "_")
-    return os.path.join(CACHE_DIR, f"{safe_ticker}_{period}.csv")
+    return os.path.join(CACHE_DIR, f"{safe_ticker}{backend.extension}")
 
 
-def _is_cache_valid(cache_path: str) -> bool:
+def _is_cache_valid(cache_path: str, max_age_hours: float = CACHE_EXPIRY_HOURS) -> bool:
     """Check whether the cached file exists and is recent enough."""
     if not os.path.exists(cache_path):
         return False
     modified_time = datetime.fromtimestamp(os.path.getmtime(cache_path))
-    return (datetime.now() - modified_time) < timedelta(hours=CACHE_EXPIRY_HOURS)
+    return (datetime.now() - modified_time) < timedelta(hours=max_age_hours)
+
+
+def _get_meta_path(cache_path: str) -> str:
+    """Path of the JSON sidecar for a cache file."""
+    return cache_path + ".meta.json"
+
+
+def _read_cache_meta(cache_path: str) -> dict:
+    """Return the sidecar metadata for a cache file, or {} if missing."""
+    try:
+        with open(_get_meta_path(cache_path)) as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_cache(df: pd.DataFrame, cache_path: str, backend, ticker: str, period: str) -> None:
+    """Write data and its sidecar atomically (temp file + rename)."""
+    tmp_path = cache_path + ".tmp"
+    backend.write(df, tmp_path)
+    os.replace(tmp_path, cache_path)
+
+    meta = {
+        "ticker": ticker.upper(),
+        "period": period,
+        "format": type(backend).__name__,
+        "rows": len(df),
+        "columns": df.columns.tolist(),
+        "first_date": df.index[0].isoformat() if len(df) else None,
+        "last_date": df.index[-1].isoformat() if len(df) else None,
+        "tz": str(df.index.tz) if getattr(df.index, "tz", None) else None,
+        "fetched_at": datetime.now().isoformat(),
+    }
+    meta_path = _get_meta_path(cache_path)
+    with open(meta_path + ".tmp", "w") as fh:
+        json.dump(meta, fh, indent=2)
+    os.replace(meta_path + ".tmp", meta_path)
+
+
+def _read_cache(cache_path: str, backend) -> pd.DataFrame:
+    """
+    Load a cache file written by ``_write_cache``.
+
+    The decoded frame is shared through ``_frame_cache``; callers must
+    treat it as read-only (``_slice_period`` returns a copy).
+    """
+    def load():
+        meta = _read_cache_meta(cache_path)
+        df = backend.read(cache_path, tz=meta.get("tz"))
+        df.index.name = "Date"
+        return _from_storage_types(df)
+
+    return _frame_cache.get(cache_path, [cache_path], load)
+
+
+def _period_start(period: str, end: pd.Timestamp):
+    """
+    Return the first date covered by a yfinance ``period`` ending at ``end``.
+
+    Returns None for "max" or an unrecognised period (no trimming).
+    """
+    if period == "ytd":
+        return end.normalize().replace(month=1, day=1)
+    match = re.fullmatch(r"(\d+)(d|wk|mo|y)", period)
+    if not match:
+        return None
+    n, unit = int(match.group(1)), match.group(2)
+    offset = {
+        "d": pd.DateOffset(days=n),
+        "wk": pd.DateOffset(weeks=n),
+        "mo": pd.DateOffset(months=n),
+        "y": pd.DateOffset(years=n),
+    }[unit]
+    return end - offset
+
+
+def _period_covers(stored: str, requested: str) -> bool:
+    """Return True if history for ``stored`` includes all of ``requested``."""
+    if stored == requested or stored == "max":
+        return True
+    if requested == "max":
+        return False
+    now = pd.Timestamp.now()
+    stored_start = _period_start(stored, now)
+    requested_start = _period_start(requested, now)
+    if stored_start is None or requested_start is None:
+        return False
+    return stored_start <= requested_start
+
+
+def _slice_period(df: pd.DataFrame, period: str) -> pd.DataFrame:
+    """Return a copy of the rows of ``df`` that fall inside ``period``."""
+    start = _period_start(period, pd.Timestamp.now(tz=df.index.tz))
+    if start is None:
+        return df.copy()
+    return df[df.index >= start]
+
+
+def _download(ticker: str, allow_empty: bool = False, **history_kwargs) -> pd.DataFrame:
+    """
+    Download OHLCV data with retry logic.
+
+    ``history_kwargs`` are passed to the data provider (``period`` or
+    ``start``/``end``).  An empty result is an error unless
+    ``allow_empty`` is set.  Every attempt waits for the shared rate
+    limiter; failures back off exponentially with full jitter.
+    """
+    for attempt in range(1, MAX_RETRIES + 1):
+        try:
+            logger.info(
+                "Downloading %s data (attempt %d/%d)...", ticker, attempt, MAX_RETRIES
+            )
+            _rate_limiter.acquire()
+            df = _provider(ticker, **history_kwargs)
+
+            if df.empty and not allow_empty:
+                raise ValueError(f"No data returned for ticker '{ticker}'.")
+
+            # Standardise column names
+            df.index.name = "Date"
+
+            # Keep only the columns we need
+            keep_cols = ["Open", "High", "Low", "Close", "Volume"]
+            if "Adj Close" in df.columns:
+                keep_cols.append("Adj Close")
+            return df[[c for c in keep_cols if c in df.columns]]
+
+        except Exception as exc:
+            logger.warning("Attempt %d failed for %s: %s", attempt, ticker, exc)
+            if attempt < MAX_RETRIES:
+                cap = min(MAX_RETRY_DELAY, RETRY_DELAY * 2 ** (attempt - 1))
+                time.sleep(random.uniform(0, cap))
+            else:
+                raise ValueError(
+                    f"Failed to fetch data for '{ticker}' after {MAX_RETRIES} attempts: {exc}"
+                ) from exc
+
+
+def _refresh_cache(ticker: str, period: str, cache_path: str, backend):
+    """
+    Bring an expired cache up to date by downloading only the missing bars.
+
+    The last ``DELTA_OVERLAP_DAYS`` are re-fetched and compared with the
+    cache; a mismatch (e.g. a split or dividend re-adjusted history)
+    returns None so the caller falls back to a full download.
+
+    Returns
+    -------
+    pd.DataFrame or None
+        The merged history, or None if a full download is required.
+    """
+    cached = _read_cache(cache_path, backend)
+    if cached.empty:
+        return None
+
+    last_date = cached.index[-1]
+    start = (last_date - timedelta(days=DELTA_OVERLAP_DAYS)).date()
+    # Same precision as the cached rows, so the merged frame matches a later read
+    fresh = backend.normalize(_download(ticker, allow_empty=True, start=start.isoformat()))
+
+    if fresh.empty:
+        # Nothing new (weekend/holiday) — just mark the cache as fresh
+        os.utime(cache_path)
+        return cached
+
+    if fresh.index.tz is not None and cached.index.tz != fresh.index.tz:
+        cached = cached.tz_convert(fresh.index.tz)
+
+    # Compare settled bars present in both (the last cached bar may have
+    # been a partial intraday bar, so it is allowed to change)
+    overlap = cached.index[:-1].intersection(fresh.index)
+    price_cols = [c for c in ("Close", "Adj Close") if c in cached.columns and c in fresh.columns]
+    if len(overlap) and price_cols:
+        old = cached.loc[overlap, price_cols].to_numpy()
+        new = fresh.loc[overlap, price_cols].to_numpy()
+        if not np.allclose(old, new, rtol=DELTA_PRICE_RTOL, equal_nan=True):
+            logger.info("Cached history for %s was re-adjusted upstream.", ticker)
+            return None
+
+    merged = pd.concat([cached[cached.index < fresh.index[0]], fresh])
+    merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+    merged = _slice_period(merged, period)
+
+    _write_cache(merged, cache_path, backend, ticker, period)
+    logger.info(
+        "Delta-refreshed %s: %d new/updated rows (cache now %d rows).",
+        ticker, len(fresh), len(merged),
+    )
+    return merged
 
 
 def fetch_stock_data(
     ticker: str,
     period: str = "5y",
     use_cache: bool = True,
+    cache_format: str = None,
+    max_age_hours: float = CACHE_EXPIRY_HOURS,
+    incremental: bool = True,
 ) -> pd.DataFrame:
     """
     Fetch historical OHLCV data for a given stock ticker.
@@ -56,9 +433,18 @@ def fetch_stock_data(
     ticker : str
         Stock ticker symbol (e.g., "AAPL", "GOOGL").
     period : str
-        Data period to download (e.g., "1y", "2y", "5y", "max").
+        Data period to download (e.g., "1y", "2y", "5y", "max").  Served
+        from the ticker's canonical cache whenever that already covers it.
     use_cache : bool
         If True, return cached data if available and fresh.
+    cache_format : str or None
+        Cache backend ("csv", "parquet" or "arrow"); defaults to
+        ``CACHE_FORMAT``.
+    max_age_hours : float
+        Cache files older than this are refreshed.
+    incremental : bool
+        If True, refresh an expired cache by downloading only the bars
+        after the last cached date instead of the whole period.
 
     Returns
     -------
@@ -70,52 +456,119 @@ def fetch_stock_data(
     ------
     ValueError
         If the ticker is invalid or no data is returned after retries.
+
+    Notes
+    -----
+    Concurrent calls with identical arguments share a single fetch;
+    callers that joined an in-flight fetch receive their own copy.
     """
-    cache_path = _get_cache_path(ticker, period)
+    key = (ticker.upper(), period, use_cache, cache_format, max_age_hours, incremental)
+    df, shared = _in_flight.do(
+        key, _fetch_stock_data,
+        ticker, period, use_cache, cache_format, max_age_hours, incremental,
+    )
+    return df.copy() if shared else df
 
-    # ── Try cache first ───────────────────────────────────────────────────
-    if use_cache and _is_cache_valid(cache_path):
-        logger.info("Loading cached data for %s from %s", ticker, cache_path)
-        df = pd.read_csv(cache_path, index_col="Date", parse_dates=True)
-        return df
 
-    # ── Download with retry logic ────────────────────────────────────────
-    for attempt in range(1, MAX_RETRIES + 1):
-        try:
-            logger.info(
-                "Downloading %s data (attempt %d/%d)...", ticker, attempt, MAX_RETRIES
-            )
-            stock = yf.Ticker(ticker)
-            df = stock.history(period=period, auto_adjust=False)
+def _fetch_stock_data(
+    ticker: str,
+    period: str,
+    use_cache: bool,
+    cache_format: str,
+    max_age_hours: float,
+    incremental: bool,
+) -> pd.DataFrame:
+    """Uncoalesced implementation of ``fetch_stock_data``."""
+    backend = get_cache_backend(cache_format)
+    cache_path = _get_cache_path(ticker, backend)
+    stored_period = None
+    if os.path.exists(cache_path):
+        stored_period = _read_cache_meta(cache_path).get("period")
+    covered = stored_period is not None and _period_covers(stored_period, period)
 
-            if df.empty:
-                raise ValueError(f"No data returned for ticker '{ticker}'.")
+    if use_cache and covered:
+        df = None
+        # ── Try cache first ───────────────────────────────────────────────
+        if _is_cache_valid(cache_path, max_age_hours):
+            logger.info("Loading cached data for %s from %s", ticker, cache_path)
+            df = _read_cache(cache_path, backend)
 
-            # Standardise column names
-            df.index.name = "Date"
+        # ── Delta refresh of an expired cache ────────────────────────────
+        elif incremental:
+            try:
+                df = _refresh_cache(ticker, stored_period, cache_path, backend)
+            except Exception as exc:
+                logger.warning("Delta refresh failed for %s, re-downloading: %s", ticker, exc)
 
-            # Keep only the columns we need
-            keep_cols = ["Open", "High", "Low", "Close", "Volume"]
-            if "Adj Close" in df.columns:
-                keep_cols.append("Adj Close")
-            df = df[[c for c in keep_cols if c in df.columns]]
+        if df is not None:
+            return _slice_period(df, period)
 
-            # Save to cache
-            df.to_csv(cache_path)
-            logger.info(
-                "Successfully fetched %d rows for %s. Cached to %s.",
-                len(df), ticker, cache_path,
-            )
-            return df
+    # ── Full download ────────────────────────────────────────────────────
+    # Re-download the full stored span when refreshing it, so the
+    # canonical history never shrinks
+    fetch_period = stored_period if (use_cache and covered) else period
+    # Return what the cache will return on the next read, bit for bit
+    df = backend.normalize(_download(ticker, period=fetch_period))
 
-        except Exception as exc:
-            logger.warning("Attempt %d failed for %s: %s", attempt, ticker, exc)
-            if attempt < MAX_RETRIES:
-                time.sleep(RETRY_DELAY * attempt)  # exponential-ish back-off
-            else:
-                raise ValueError(
-                    f"Failed to fetch data for '{ticker}' after {MAX_RETRIES} attempts: {exc}"
-                ) from exc
+    if stored_period is None or _period_covers(fetch_period, stored_period):
+        _write_cache(df, cache_path, backend, ticker, fetch_period)
+        logger.info(
+            "Successfully fetched %d rows for %s. Cached to %s.",
+            len(df), ticker, cache_path,
+        )
+    return _slice_period(df, period) if fetch_period != period else df
+
+
+def fetch_many(
+    tickers: list,
+    period: str = "5y",
+    max_workers: int = BULK_MAX_WORKERS,
+    **fetch_kwargs,
+) -> tuple:
+    """
+    Fetch many tickers concurrently.
+
+    Downloads run on a bounded thread pool and share the module-wide rate
+    limiter; duplicate tickers are fetched once.
+
+    Parameters
+    ----------
+    tickers : list of str
+        Ticker symbols.
+    period : str
+        Data period for every ticker.
+    max_workers : int
+        Maximum number of concurrent fetches.
+    **fetch_kwargs
+        Passed through to ``fetch_stock_data``.
+
+    Returns
+    -------
+    tuple of (data: dict, errors: dict)
+        ``data`` maps ticker → DataFrame for successful fetches, ``errors``
+        maps ticker → exception for failed ones.  Keys are upper-cased.
+    """
+    unique = list(dict.fromkeys(t.upper() for t in tickers))
+    data, errors = {}, {}
+    if not unique:
+        return data, errors
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(unique)))) as pool:
+        futures = {
+            pool.submit(fetch_stock_data, ticker, period, **fetch_kwargs): ticker
+            for ticker in unique
+        }
+        for future in as_completed(futures):
+            ticker = futures[future]
+            try:
+                data[ticker] = future.result()
+            except Exception as exc:
+                errors[ticker] = exc
+
+    logger.info(
+        "Bulk fetch complete: %d succeeded, %d failed.", len(data), len(errors)
+    )
+    return data, errors
 
 
 def get_company_info(ticker: str) -> dict:
@@ -127,6 +580,8 @@ def get_company_info(ticker: str) -> dict:
     dict
         Keys: shortName, sector, industry, marketCap, website.
     """
+    import yfinance as yf
+
     try:
         stock = yf.Ticker(ticker)
         info = stock.info
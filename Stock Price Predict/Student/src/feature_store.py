@@ -0,0 +1,297 @@
+"""
+feature_store.py — Persistent Feature Store
+============================================
+Persists the output of ``add_all_technical_indicators`` per ticker so
+that training, prediction and notebooks stop rebuilding the same
+indicator frame from the same OHLCV data.
+
+Each ticker has one stored frame covering the longest history seen so
+far, keyed by a fingerprint of the indicator configuration; it remembers
+a hash of every input row.  A lookup locates the first incoming bar in
+the stored history and compares the overlapping rows:
+
+  • window of the stored history — the matching rows are returned
+                                   (e.g. a 2y prediction after a 5y
+                                   training run)
+  • overlap, then new bars       — only the new bars are computed
+                                   (``extend_technical_indicators``) and
+                                   appended to the stored history, so a
+                                   rolling window that dropped leading
+                                   rows is still served incrementally
+  • anything else                — the frame is rebuilt from scratch;
+                                   it replaces the stored history only
+                                   if it reaches back at least as far,
+                                   otherwise it is kept in memory only
+
+Rows of a window that starts after the stored history are computed over
+the bars before it, so their indicators are already warmed up instead
+of NaN, and the window's EMAs continue the longer history.
+
+Decoded frames and their ``prepare_features`` output are also kept in
+memory, so repeated calls with unchanged data do no feature work at all.
+
+Author : Student ML Engineer
+Project: Stock Price Prediction System
+"""
+
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import threading
+import numpy as np
+import pandas as pd
+
+from src import features
+from src.artifact_cache import ArtifactCache
+from src.concurrency import SingleFlight
+from src.features import (
+    MIN_HISTORY,
+    add_all_technical_indicators,
+    extend_technical_indicators,
+    prepare_features,
+)
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+FEATURE_STORE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "features")
+FEATURE_STORE_VERSION = 1  # bump when the stored layout or indicator maths change
+MEMORY_CACHE_MAX_TICKERS = 32
+MEMORY_CACHE_MAX_BYTES = 512 << 20
+
+logger = logging.getLogger(__name__)
+
+
+def config_fingerprint() -> str:
+    """Hash of the indicator configuration the stored frames were built with."""
+    config = {
+        "version": FEATURE_STORE_VERSION,
+        "sma_windows": features.SMA_WINDOWS,
+        "ema_spans": features.EMA_SPANS,
+        "rsi_window": features.RSI_WINDOW,
+        "macd": [features.MACD_FAST, features.MACD_SLOW, features.MACD_SIGNAL],
+        "bollinger": [features.BB_WINDOW, features.BB_NUM_STD],
+        "num_lags": features.NUM_LAGS,
+        "volume_window": features.VOLUME_WINDOW,
+        "columns": features.INDICATOR_COLUMNS,
+    }
+    return hashlib.sha1(json.dumps(config, sort_keys=True).encode()).hexdigest()
+
+
+def row_hashes(df: pd.DataFrame) -> np.ndarray:
+    """One uint64 hash per row, covering the index and every column."""
+    return pd.util.hash_pandas_object(df, index=True).to_numpy()
+
+
+def _common_prefix(a: np.ndarray, b: np.ndarray) -> int:
+    """Number of leading rows on which two row-hash arrays agree."""
+    n = min(len(a), len(b))
+    mismatch = np.flatnonzero(a[:n] != b[:n])
+    return int(mismatch[0]) if len(mismatch) else n
+
+
+class FeatureStore:
+    """
+    Disk-backed store of indicator frames with an in-memory LRU in front.
+
+    Returned frames are shared between callers and must be treated as
+    read-only.
+
+    Parameters
+    ----------
+    root : str
+        Directory the stored frames are written to.
+    max_entries, max_bytes : int
+        Bounds of the in-memory cache (see ``ArtifactCache``).
+    """
+
+    def __init__(
+        self,
+        root: str = FEATURE_STORE_DIR,
+        max_entries: int = MEMORY_CACHE_MAX_TICKERS,
+        max_bytes: int = MEMORY_CACHE_MAX_BYTES,
+    ):
+        self.root = root
+        self.fingerprint = config_fingerprint()
+        self._entries = ArtifactCache(max_entries=max_entries, max_bytes=max_bytes)
+        self._in_flight = SingleFlight()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.extensions = 0
+        self.rebuilds = 0
+
+    def path(self, ticker: str) -> str:
+        """File holding the stored history of ``ticker``."""
+        safe_ticker = ticker.upper().replace("/", "_")
+        return os.path.join(self.root, f"{safe_ticker}_{self.fingerprint[:12]}.pkl")
+
+    def indicators(self, ticker: str, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Return the technical indicators of ``df``, reusing stored work.
+
+        The frame has ``df``'s rows and columns plus ``INDICATOR_COLUMNS``.
+        When ``df`` is a window of a longer stored history, its indicators
+        are computed over that history: leading rows are warmed up instead
+        of NaN and the EMAs continue from earlier bars.  The result then
+        differs from ``add_all_technical_indicators(df)`` and depends on
+        the history stored for the ticker (the longest seen).  Call
+        ``add_all_technical_indicators`` directly when the values must
+        depend on ``df`` alone.
+
+        Parameters
+        ----------
+        ticker : str
+            Stock ticker symbol the data belongs to.
+        df : pd.DataFrame
+            Raw OHLCV data in chronological order.
+        """
+        return self._entry(ticker, df)["frame"]
+
+    def features(
+        self,
+        ticker: str,
+        df: pd.DataFrame,
+        target_col: str = "Close",
+        drop_na: bool = True,
+        dtype=None,
+    ) -> tuple:
+        """
+        Return ``prepare_features`` applied to ``indicators(ticker, df)``.
+
+        A window of a longer stored history keeps its warmed-up leading
+        rows when NaN rows are dropped, so it can yield more rows than
+        ``prepare_features(add_all_technical_indicators(df))``.  The
+        stored frame stays float64; ``dtype`` only applies to the returned
+        feature matrix.
+
+        Returns
+        -------
+        tuple of (X: pd.DataFrame, y: pd.Series)
+        """
+        entry = self._entry(ticker, df)
+        key = (entry["window"], target_col, drop_na, None if dtype is None else np.dtype(dtype).str)
+        prepared = entry["prepared"]
+        if key not in prepared:
+            prepared[key] = prepare_features(
+                entry["frame"], target_col=target_col, drop_na=drop_na, dtype=dtype,
+            )
+        return prepared[key]
+
+    def invalidate(self, ticker: str = None) -> None:
+        """Delete the stored frame for one ticker, or for every ticker when None."""
+        if ticker is None:
+            self._entries.invalidate()
+            if os.path.isdir(self.root):
+                for name in os.listdir(self.root):
+                    if name.endswith(".pkl"):
+                        os.remove(os.path.join(self.root, name))
+            return
+        path = self.path(ticker)
+        self._entries.invalidate(path)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def stats(self) -> dict:
+        """Return hit/extension/rebuild counters and memory-cache statistics."""
+        with self._lock:
+            counters = {
+                "hits": self.hits,
+                "extensions": self.extensions,
+                "rebuilds": self.rebuilds,
+            }
+        return {**counters, "memory": self._entries.stats()}
+
+    # ── Internal helpers ─────────────────────────────────────────────────
+
+    def _entry(self, ticker: str, df: pd.DataFrame) -> dict:
+        hashes = row_hashes(df)
+        path = self.path(ticker)
+        digest = hashlib.sha1(hashes.tobytes()).hexdigest()
+        entry, _ = self._in_flight.do((path, digest), self._resolve, path, df, hashes, digest)
+        return entry
+
+    def _load(self, path: str):
+        """Return the stored entry at ``path`` (memory first), or None."""
+        if not os.path.exists(path):
+            return None
+
+        def load():
+            import joblib
+            payload = joblib.load(path)
+            return {**payload, "prepared": {}}
+
+        try:
+            return self._entries.get(path, [path], load)
+        except Exception as exc:
+            logger.warning("Ignoring unreadable feature store file %s: %s", path, exc)
+            return None
+
+    def _resolve(self, path: str, df: pd.DataFrame, hashes: np.ndarray, digest: str) -> dict:
+        stored = self._load(path)
+        columns = df.columns.tolist()
+        start = common = 0
+        if stored is not None and stored["input_columns"] == columns and len(df):
+            # Position of the first incoming bar in the stored history
+            start = int(stored["frame"].index.searchsorted(df.index[0]))
+            common = _common_prefix(stored["row_hashes"][start:], hashes)
+
+        if stored is not None and common == len(hashes) > 0:
+            self._count("hits")
+            return self._window(stored, start, len(hashes))
+
+        if stored is not None and common > 0 and start + common >= MIN_HISTORY:
+            frame = stored["frame"].iloc[:start + common]
+            frame = extend_technical_indicators(frame, df.iloc[common:])
+            stored_hashes = np.concatenate([stored["row_hashes"][:start + common], hashes[common:]])
+            self._count("extensions")
+            logger.info("Feature store: extended %s by %d rows", os.path.basename(path), len(df) - common)
+        else:
+            frame = add_all_technical_indicators(df)
+            stored_hashes = hashes
+            start = 0
+            self._count("rebuilds")
+            logger.info("Feature store: built %s (%d rows)", os.path.basename(path), len(df))
+            if stored is not None and len(df) and df.index[0] > stored["frame"].index[0]:
+                # A shorter window that does not match the stored history:
+                # keep the longer history on disk, this frame in memory only
+                window = self._entries.get(f"{path}#{digest}", [], lambda: {"frame": frame, "prepared": {}})
+                return self._window(window, 0, len(hashes))
+
+        entry = {"frame": frame, "row_hashes": stored_hashes, "input_columns": columns}
+        self._save(path, entry)
+        stored = self._entries.get(path, [path], lambda: {**entry, "prepared": {}})
+        return self._window(stored, start, len(hashes))
+
+    @staticmethod
+    def _window(stored: dict, start: int, length: int) -> dict:
+        """The rows ``start:start + length`` of a stored history."""
+        frame = stored["frame"]
+        if start or length != len(frame):
+            frame = frame.iloc[start:start + length]
+        # ``prepared`` is shared by every window; its keys include the window
+        return {"frame": frame, "window": (start, length), "prepared": stored["prepared"]}
+
+    def _save(self, path: str, entry: dict) -> None:
+        """Write an entry atomically (temp file + rename)."""
+        import joblib
+
+        os.makedirs(self.root, exist_ok=True)
+        # A unique temp file: training processes may write the same ticker at once
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix=os.path.basename(path) + ".", suffix=".tmp")
+        os.close(fd)
+        try:
+            joblib.dump(entry, tmp_path)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+
+# Shared store used by the training and prediction pipelines
+feature_store = FeatureStore()
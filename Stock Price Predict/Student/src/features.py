@@ -9,13 +9,47 @@ Technical Indicators:
   • Bollinger Bands               • Daily Returns
   • Lag features (t-1 … t-N)
 
+``add_all_technical_indicators`` computes every indicator with one fused
+NumPy kernel (the EMA recursion and rolling std are Numba-compiled on
+first use when numba is installed); the per-indicator ``add_*`` functions
+are the readable pandas reference and produce the same columns.
+
 Author : Student ML Engineer
 Project: Stock Price Prediction System
 """
 
 import numpy as np
 import pandas as pd
-from sklearn.preprocessing import MinMaxScaler
+import importlib.util
+from numpy.lib.stride_tricks import sliding_window_view
+
+# numba and scikit-learn are imported on first use to keep import time low
+HAVE_NUMBA = importlib.util.find_spec("numba") is not None
+
+# ---------------------------------------------------------------------------
+# Indicator configuration (defaults used by add_all_technical_indicators)
+# ---------------------------------------------------------------------------
+SMA_WINDOWS = (7, 21, 50)
+EMA_SPANS = (12, 26)
+RSI_WINDOW = 14
+MACD_FAST, MACD_SLOW, MACD_SIGNAL = 12, 26, 9
+BB_WINDOW, BB_NUM_STD = 20, 2.0
+NUM_LAGS = 5
+VOLUME_WINDOW = 20
+
+# Columns appended by add_all_technical_indicators, in order
+INDICATOR_COLUMNS = (
+    [f"SMA_{w}" for w in SMA_WINDOWS]
+    + [f"EMA_{s}" for s in EMA_SPANS]
+    + ["RSI", "MACD", "MACD_Signal", "MACD_Hist"]
+    + ["BB_Upper", "BB_Middle", "BB_Lower", "BB_Width"]
+    + ["Daily_Return"]
+    + [f"Close_Lag_{lag}" for lag in range(1, NUM_LAGS + 1)]
+    + [f"Volume_SMA_{VOLUME_WINDOW}", "Volume_Ratio"]
+)
+
+# Longest look-back needed before the first complete feature row exists
+MIN_HISTORY = max(max(SMA_WINDOWS), RSI_WINDOW + 1, BB_WINDOW, NUM_LAGS + 1, VOLUME_WINDOW)
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -93,24 +127,259 @@ def add_volume_features(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
+# ═══════════════════════════════════════════════════════════════════════════
+# Fused Kernel
+# ═══════════════════════════════════════════════════════════════════════════
+
+def _ema_loop(x: np.ndarray, alpha: float, out: np.ndarray) -> None:
+    """EMA recursion matching ``ewm(adjust=False)``: y₀ = x₀, yₜ = αxₜ + (1-α)yₜ₋₁."""
+    out[0] = x[0]
+    for i in range(1, x.shape[0]):
+        out[i] = alpha * x[i] + (1.0 - alpha) * out[i - 1]
+
+
+_jitted = {}
+
+
+def _jit(fn):
+    """Numba-compiled ``fn``, compiled on first call (requires numba)."""
+    if fn not in _jitted:
+        from numba import njit
+        _jitted[fn] = njit(cache=True)(fn)
+    return _jitted[fn]
+
+
+def _ema(x: np.ndarray, span: int, seed: float = None) -> np.ndarray:
+    """
+    Exponential moving average of a float64 array.
+
+    ``seed`` continues an existing EMA whose last value it is, instead of
+    starting the recursion at ``x[0]``.
+    """
+    if seed is not None:
+        return _ema(np.concatenate(([seed], x)), span)[1:]
+    alpha = 2.0 / (span + 1.0)
+    if HAVE_NUMBA:
+        out = np.empty_like(x)
+        _jit(_ema_loop)(x, alpha, out)
+        return out
+    from scipy.signal import lfilter
+    out, _ = lfilter([alpha], [1.0, alpha - 1.0], x, zi=[(1.0 - alpha) * x[0]])
+    return out
+
+
+def _rolling_mean(x: np.ndarray, window: int, out: np.ndarray) -> None:
+    """Trailing rolling mean of ``x`` into ``out`` (NaN-padded), via cumulative sums."""
+    out[:window - 1] = np.nan
+    if x.shape[0] >= window:
+        csum = np.cumsum(x)
+        out[window - 1] = csum[window - 1]
+        np.subtract(csum[window:], csum[:-window], out=out[window:])
+        out[window - 1:] /= window
+
+
+def _rolling_std_loop(x: np.ndarray, window: int, out: np.ndarray) -> None:
+    """Two-pass sample std (ddof=1) of every trailing window of ``x``."""
+    for i in range(window - 1, x.shape[0]):
+        mean = 0.0
+        for j in range(i - window + 1, i + 1):
+            mean += x[j]
+        mean /= window
+        ss = 0.0
+        for j in range(i - window + 1, i + 1):
+            ss += (x[j] - mean) ** 2
+        out[i] = (ss / (window - 1)) ** 0.5
+
+
+def _rolling_std(x: np.ndarray, window: int, out: np.ndarray) -> None:
+    """Trailing rolling sample std (ddof=1) of ``x`` into ``out`` (NaN-padded)."""
+    out[:window - 1] = np.nan
+    if x.shape[0] < window:
+        return
+    if HAVE_NUMBA:
+        _jit(_rolling_std_loop)(x, window, out)
+    else:
+        out[window - 1:] = sliding_window_view(x, window).std(axis=1, ddof=1)
+
+
+def compute_indicator_matrix(
+    close: np.ndarray,
+    volume: np.ndarray,
+    dtype=np.float64,
+) -> np.ndarray:
+    """
+    Compute every indicator column into one preallocated 2-D array.
+
+    Parameters
+    ----------
+    close, volume : np.ndarray
+        1-D price and volume arrays in chronological order (no NaNs).
+    dtype : numpy dtype
+        Output dtype (float64 or float32); arithmetic is done in float64.
+
+    Returns
+    -------
+    np.ndarray
+        Shape (len(close), len(INDICATOR_COLUMNS)), columns in
+        ``INDICATOR_COLUMNS`` order, NaN where the look-back is incomplete.
+    """
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    volume = np.ascontiguousarray(volume, dtype=np.float64)
+    n = close.shape[0]
+    out = np.empty((n, len(INDICATOR_COLUMNS)), dtype=dtype)
+    col = {name: i for i, name in enumerate(INDICATOR_COLUMNS)}
+    tmp = np.empty(n)
+
+    for w in SMA_WINDOWS:
+        _rolling_mean(close, w, tmp)
+        out[:, col[f"SMA_{w}"]] = tmp
+
+    emas = {s: _ema(close, s) for s in set(EMA_SPANS) | {MACD_FAST, MACD_SLOW}}
+    for s in EMA_SPANS:
+        out[:, col[f"EMA_{s}"]] = emas[s]
+
+    # RSI (simple rolling means of gains and losses)
+    delta = np.empty(n)
+    delta[0] = np.nan
+    np.subtract(close[1:], close[:-1], out=delta[1:])
+    avg_gain = np.full(n, np.nan)
+    avg_loss = np.full(n, np.nan)
+    if n > 1:
+        _rolling_mean(np.clip(delta[1:], 0, None), RSI_WINDOW, avg_gain[1:])
+        _rolling_mean(-np.clip(delta[1:], None, 0), RSI_WINDOW, avg_loss[1:])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[:, col["RSI"]] = 100 - (100 / (1 + avg_gain / avg_loss))
+
+    macd = emas[MACD_FAST] - emas[MACD_SLOW]
+    signal = _ema(macd, MACD_SIGNAL)
+    out[:, col["MACD"]] = macd
+    out[:, col["MACD_Signal"]] = signal
+    out[:, col["MACD_Hist"]] = macd - signal
+
+    # Bollinger Bands
+    mid = np.empty(n)
+    std = np.empty(n)
+    _rolling_mean(close, BB_WINDOW, mid)
+    _rolling_std(close, BB_WINDOW, std)
+    upper = mid + BB_NUM_STD * std
+    lower = mid - BB_NUM_STD * std
+    out[:, col["BB_Upper"]] = upper
+    out[:, col["BB_Middle"]] = mid
+    out[:, col["BB_Lower"]] = lower
+    out[:, col["BB_Width"]] = (upper - lower) / mid
+
+    tmp[0] = np.nan
+    tmp[1:] = (close[1:] / close[:-1] - 1) * 100
+    out[:, col["Daily_Return"]] = tmp
+
+    for lag in range(1, NUM_LAGS + 1):
+        c = col[f"Close_Lag_{lag}"]
+        out[:lag, c] = np.nan
+        out[lag:, c] = close[:-lag]
+
+    _rolling_mean(volume, VOLUME_WINDOW, tmp)
+    out[:, col[f"Volume_SMA_{VOLUME_WINDOW}"]] = tmp
+    out[:, col["Volume_Ratio"]] = volume / tmp
+    return out
+
+
 # ═══════════════════════════════════════════════════════════════════════════
 # Full Pipeline
 # ═══════════════════════════════════════════════════════════════════════════
 
-def add_all_technical_indicators(df: pd.DataFrame) -> pd.DataFrame:
+def add_all_technical_indicators(df: pd.DataFrame, dtype=np.float64) -> pd.DataFrame:
     """
     Apply all technical indicators in one call.
 
+    Uses ``compute_indicator_matrix``; empty inputs or inputs containing
+    NaN prices or volumes fall back to the pandas reference implementation.
+
     Parameters
     ----------
     df : pd.DataFrame
         DataFrame with at least 'Close' and 'Volume' columns.
+    dtype : numpy dtype
+        dtype of the indicator columns (float32 halves their memory).
 
     Returns
     -------
     pd.DataFrame
         Original DataFrame with indicator columns appended.
     """
+    close = df["Close"].to_numpy(dtype=np.float64)
+    volume = df["Volume"].to_numpy(dtype=np.float64)
+    if len(close) == 0 or np.isnan(close).any() or np.isnan(volume).any():
+        return _add_all_technical_indicators_pandas(df)
+
+    matrix = compute_indicator_matrix(close, volume, dtype=dtype)
+    base = df.drop(columns=[c for c in INDICATOR_COLUMNS if c in df.columns])
+    indicators = pd.DataFrame(matrix, index=df.index, columns=INDICATOR_COLUMNS)
+    return pd.concat([base, indicators], axis=1)
+
+
+def extend_technical_indicators(enriched: pd.DataFrame, new_rows: pd.DataFrame) -> pd.DataFrame:
+    """
+    Append indicator rows for ``new_rows`` to an already enriched frame.
+
+    Windowed indicators are computed over the last ``MIN_HISTORY`` known
+    bars plus the new ones; the EMA family continues from the last stored
+    EMA and MACD signal values.  Falls back to a full recomputation when
+    the stored frame cannot seed the new rows.
+
+    Parameters
+    ----------
+    enriched : pd.DataFrame
+        Output of ``add_all_technical_indicators``.
+    new_rows : pd.DataFrame
+        Bars following ``enriched``, with the same raw columns.
+
+    Returns
+    -------
+    pd.DataFrame
+        Equivalent to ``add_all_technical_indicators`` on the concatenated bars.
+    """
+    if len(new_rows) == 0:
+        return enriched
+
+    base_cols = new_rows.columns.tolist()
+    raw = pd.concat([enriched[base_cols], new_rows]) if set(base_cols) <= set(enriched.columns) else None
+    ema_spans = set(EMA_SPANS) | {MACD_FAST, MACD_SLOW}
+    seed_cols = [f"EMA_{s}" for s in ema_spans] + ["MACD_Signal"]
+    seedable = (
+        raw is not None
+        and enriched.columns.tolist() == base_cols + INDICATOR_COLUMNS
+        and len(enriched) >= MIN_HISTORY
+        and not enriched[seed_cols].iloc[-1].isna().any()
+    )
+    if seedable:
+        tail = raw.iloc[-(MIN_HISTORY + len(new_rows)):]
+        close = tail["Close"].to_numpy(dtype=np.float64)
+        volume = tail["Volume"].to_numpy(dtype=np.float64)
+        seedable = not (np.isnan(close).any() or np.isnan(volume).any())
+    if not seedable:
+        if raw is None:
+            raw = pd.concat([enriched.drop(columns=INDICATOR_COLUMNS, errors="ignore"), new_rows])
+        return add_all_technical_indicators(raw)
+
+    k = len(new_rows)
+    matrix = compute_indicator_matrix(close, volume)[-k:]
+    col = {name: i for i, name in enumerate(INDICATOR_COLUMNS)}
+    last = enriched.iloc[-1]
+    emas = {s: _ema(close[-k:], s, seed=float(last[f"EMA_{s}"])) for s in ema_spans}
+    for s in EMA_SPANS:
+        matrix[:, col[f"EMA_{s}"]] = emas[s]
+    macd = emas[MACD_FAST] - emas[MACD_SLOW]
+    signal = _ema(macd, MACD_SIGNAL, seed=float(last["MACD_Signal"]))
+    matrix[:, col["MACD"]] = macd
+    matrix[:, col["MACD_Signal"]] = signal
+    matrix[:, col["MACD_Hist"]] = macd - signal
+
+    indicators = pd.DataFrame(matrix, index=new_rows.index, columns=INDICATOR_COLUMNS)
+    return pd.concat([enriched, pd.concat([new_rows, indicators], axis=1)])
+
+
+def _add_all_technical_indicators_pandas(df: pd.DataFrame) -> pd.DataFrame:
+    """Reference implementation built from the individual ``add_*`` functions."""
     df = df.copy()
     df = add_sma(df)
     df = add_ema(df)
@@ -127,6 +396,7 @@ def prepare_features(
     df: pd.DataFrame,
     target_col: str = "Close",
     drop_na: bool = True,
+    dtype=None,
 ) -> tuple:
     """
     Prepare feature matrix X and target vector y.
@@ -139,13 +409,15 @@ def prepare_features(
         Column to predict.
     drop_na : bool
         If True, drop rows with NaN values (from rolling calculations).
+    dtype : numpy dtype or None
+        Cast the feature columns to this dtype (e.g. ``np.float32``); the
+        target keeps its dtype.
 
     Returns
     -------
     tuple of (X: pd.DataFrame, y: pd.Series)
     """
-    df = df.copy()
-
+    # Neither step modifies ``df``, so no defensive copy is needed
     if drop_na:
         df = df.dropna()
 
@@ -154,30 +426,43 @@ def prepare_features(
     feature_cols = [c for c in df.columns if c not in exclude_cols]
 
     X = df[feature_cols]
+    if dtype is not None:
+        X = X.astype(dtype, copy=False)
     y = df[target_col]
     return X, y
 
 
-def scale_features(X: pd.DataFrame, scaler: MinMaxScaler = None) -> tuple:
+def scale_features(X: pd.DataFrame, scaler=None, dtype=None) -> tuple:
     """
     Scale features using MinMaxScaler.
 
     Parameters
     ----------
-    X : pd.DataFrame
+    X : pd.DataFrame or np.ndarray
         Feature matrix.
     scaler : MinMaxScaler or None
         If None, a new scaler is fitted.
+    dtype : numpy dtype or None
+        If set (e.g. ``np.float32``), ``X`` is converted once to a
+        C-contiguous array of this dtype and scaled in it.  MinMaxScaler
+        keeps float32, and sklearn trees use float32 internally, so no
+        further copies are made downstream.  A scaler fitted this way has
+        no feature names and expects arrays.
 
     Returns
     -------
     tuple of (X_scaled: np.ndarray, scaler: MinMaxScaler)
     """
+    if dtype is not None:
+        X = np.ascontiguousarray(X, dtype=dtype)
     if scaler is None:
+        from sklearn.preprocessing import MinMaxScaler
         scaler = MinMaxScaler(feature_range=(0, 1))
         X_scaled = scaler.fit_transform(X)
     else:
         X_scaled = scaler.transform(X)
+    if dtype is not None:
+        X_scaled = np.ascontiguousarray(X_scaled, dtype=dtype)  # no-op unless a copy is needed
     return X_scaled, scaler
 
 
@@ -0,0 +1,62 @@
+"""
+incremental.py — Incrementally Updatable Estimators
+====================================================
+Estimators that can absorb new bars without revisiting the old ones.
+
+  • IncrementalLinearRegression — ordinary least squares kept as the
+    sufficient statistics XᵀX and Xᵀy, so ``partial_fit`` on a few new
+    rows costs O(rows · features²) and gives the same coefficients as a
+    refit on all rows seen so far
+
+Author : Student ML Engineer
+Project: Stock Price Prediction System
+"""
+
+import numpy as np
+from sklearn.base import BaseEstimator, RegressorMixin
+
+
+class IncrementalLinearRegression(RegressorMixin, BaseEstimator):
+    """
+    Linear regression with an intercept, solved from accumulated XᵀX / Xᵀy.
+
+    Drop-in for ``LinearRegression`` (``fit``, ``predict``, ``coef_``,
+    ``intercept_``) with an extra ``partial_fit``.  ``y`` may be 2-D for
+    direct multi-horizon targets.
+    """
+
+    def fit(self, X, y):
+        """Fit from scratch on ``X``, ``y``."""
+        for attr in ("xtx_", "xty_", "n_samples_"):
+            if hasattr(self, attr):
+                delattr(self, attr)
+        return self.partial_fit(X, y)
+
+    def partial_fit(self, X, y):
+        """Add the rows ``X``, ``y`` to the statistics and re-solve."""
+        X = np.asarray(X, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        # A column of ones turns the intercept into one more coefficient
+        X1 = np.hstack([X, np.ones((len(X), 1))])
+
+        if not hasattr(self, "xtx_"):
+            self.n_features_in_ = X.shape[1]
+            self.xtx_ = np.zeros((X1.shape[1], X1.shape[1]))
+            self.xty_ = np.zeros((X1.shape[1],) + y.shape[1:])
+            self.n_samples_ = 0
+        elif X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Expected {self.n_features_in_} features, got {X.shape[1]}.")
+
+        self.xtx_ += X1.T @ X1
+        self.xty_ += X1.T @ y
+        self.n_samples_ += len(X)
+
+        # lstsq returns the minimum-norm solution when features are collinear
+        coef = np.linalg.lstsq(self.xtx_, self.xty_, rcond=None)[0]
+        self.coef_ = coef[:-1].T
+        self.intercept_ = coef[-1]
+        return self
+
+    def predict(self, X) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float64)
+        return X @ self.coef_.T + self.intercept_
@@ -0,0 +1,208 @@
+"""
+indicator_state.py — Incremental Technical Indicator State
+===========================================================
+Keeps running indicator state for a single ticker so that recursive
+forecasts can append one synthetic bar at a time without recomputing
+every indicator over the full history.
+
+The state is seeded once from historical OHLCV data and then updated in
+constant time per bar.  ``feature_row()`` returns the same values as the
+last row of ``features.add_all_technical_indicators`` for the same data.
+
+Author : Student ML Engineer
+Project: Stock Price Prediction System
+"""
+
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from src.features import (
+    SMA_WINDOWS,
+    EMA_SPANS,
+    RSI_WINDOW,
+    MACD_FAST,
+    MACD_SLOW,
+    MACD_SIGNAL,
+    BB_WINDOW,
+    BB_NUM_STD,
+    NUM_LAGS,
+    VOLUME_WINDOW,
+    MIN_HISTORY,
+)
+
+
+def _ema_alpha(span: int) -> float:
+    """Smoothing factor used by ``Series.ewm(span=..., adjust=False)``."""
+    return 2.0 / (span + 1.0)
+
+
+class IndicatorState:
+    """
+    Running indicator state seeded from a block of OHLCV history.
+
+    Rolling means are kept as running sums over bounded ring buffers,
+    EMAs as their last smoothed value, and RSI as running gain/loss sums
+    over the last ``RSI_WINDOW`` price changes.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Historical data with at least 'Open', 'High', 'Low', 'Close' and
+        'Volume' columns, in chronological order.  If it already carries
+        the indicator columns (e.g. from the feature store), the EMA state
+        is read from its last row instead of being recomputed.
+
+    Raises
+    ------
+    ValueError
+        If fewer than ``MIN_HISTORY`` rows are supplied.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        if len(df) < MIN_HISTORY:
+            raise ValueError(
+                f"Need at least {MIN_HISTORY} rows of history to seed indicators, "
+                f"got {len(df)}."
+            )
+
+        close = df["Close"].astype(float)
+        volume = df["Volume"].astype(float)
+        closes = close.to_numpy()
+        volumes = volume.to_numpy()
+
+        # ── Ring buffers ─────────────────────────────────────────────────
+        close_len = max(max(SMA_WINDOWS), BB_WINDOW, NUM_LAGS + 1)
+        self._closes = deque(closes[-close_len:].tolist(), maxlen=close_len)
+        self._volumes = deque(volumes[-VOLUME_WINDOW:].tolist(), maxlen=VOLUME_WINDOW)
+
+        deltas = np.diff(closes[-(RSI_WINDOW + 1):])
+        self._deltas = deque(deltas.tolist(), maxlen=RSI_WINDOW)
+
+        # ── Running sums ─────────────────────────────────────────────────
+        self._sma_sums = {w: float(closes[-w:].sum()) for w in SMA_WINDOWS}
+        self._volume_sum = float(volumes[-VOLUME_WINDOW:].sum())
+        self._gain_sum = float(np.clip(deltas, 0, None).sum())
+        self._loss_sum = float(-np.clip(deltas, None, 0).sum())
+
+        # ── EMA state (seeded from the full series) ──────────────────────
+        spans = set(EMA_SPANS) | {MACD_FAST, MACD_SLOW}
+        seed_cols = [f"EMA_{s}" for s in spans] + ["MACD_Signal"]
+        if set(seed_cols) <= set(df.columns) and not df[seed_cols].iloc[-1].isna().any():
+            self._emas = {s: float(df[f"EMA_{s}"].iloc[-1]) for s in spans}
+            self._macd_signal = float(df["MACD_Signal"].iloc[-1])
+        else:
+            ema_series = {s: close.ewm(span=s, adjust=False).mean() for s in spans}
+            self._emas = {s: float(series.iloc[-1]) for s, series in ema_series.items()}
+            macd = ema_series[MACD_FAST] - ema_series[MACD_SLOW]
+            self._macd_signal = float(macd.ewm(span=MACD_SIGNAL, adjust=False).mean().iloc[-1])
+
+        last = df.iloc[-1]
+        self._last_bar = {
+            "Open": float(last["Open"]),
+            "High": float(last["High"]),
+            "Low": float(last["Low"]),
+            "Volume": float(last["Volume"]),
+        }
+
+    # ───────────────────────────────────────────────────────────────────
+    # Updates
+    # ───────────────────────────────────────────────────────────────────
+
+    def update(self, open_: float, high: float, low: float, close: float, volume: float) -> None:
+        """Append one bar and advance every indicator by a single step."""
+        close = float(close)
+        volume = float(volume)
+        closes = self._closes
+
+        # Rolling sums: subtract the value leaving each window
+        for w in SMA_WINDOWS:
+            self._sma_sums[w] += close - closes[-w]
+
+        # RSI gain/loss accumulators
+        delta = close - closes[-1]
+        old_delta = self._deltas[0]
+        self._gain_sum += max(delta, 0.0) - max(old_delta, 0.0)
+        self._loss_sum += max(-delta, 0.0) - max(-old_delta, 0.0)
+        self._deltas.append(delta)
+
+        # Volume window
+        self._volume_sum += volume - self._volumes[0]
+        self._volumes.append(volume)
+
+        # EMAs and MACD signal
+        for span, prev in self._emas.items():
+            alpha = _ema_alpha(span)
+            self._emas[span] = alpha * close + (1.0 - alpha) * prev
+        macd = self._emas[MACD_FAST] - self._emas[MACD_SLOW]
+        alpha = _ema_alpha(MACD_SIGNAL)
+        self._macd_signal = alpha * macd + (1.0 - alpha) * self._macd_signal
+
+        closes.append(close)
+        self._last_bar = {
+            "Open": float(open_),
+            "High": float(high),
+            "Low": float(low),
+            "Volume": volume,
+        }
+
+    def recent_volume_mean(self, n: int = 5) -> float:
+        """Mean of the last ``n`` volumes (n ≤ ``VOLUME_WINDOW``)."""
+        recent = list(self._volumes)[-n:]
+        return float(sum(recent) / len(recent))
+
+    # ───────────────────────────────────────────────────────────────────
+    # Feature extraction
+    # ───────────────────────────────────────────────────────────────────
+
+    def feature_row(self) -> dict:
+        """
+        Return the indicator values for the most recent bar.
+
+        Returns
+        -------
+        dict
+            Column name → value, using the same names as
+            ``features.add_all_technical_indicators``.
+        """
+        closes = self._closes
+        close = closes[-1]
+        row = dict(self._last_bar)
+
+        for w in SMA_WINDOWS:
+            row[f"SMA_{w}"] = self._sma_sums[w] / w
+        for span in EMA_SPANS:
+            row[f"EMA_{span}"] = self._emas[span]
+
+        avg_gain = self._gain_sum / RSI_WINDOW
+        avg_loss = self._loss_sum / RSI_WINDOW
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rs = np.float64(avg_gain) / np.float64(avg_loss)
+        row["RSI"] = float(100 - (100 / (1 + rs)))
+
+        macd = self._emas[MACD_FAST] - self._emas[MACD_SLOW]
+        row["MACD"] = macd
+        row["MACD_Signal"] = self._macd_signal
+        row["MACD_Hist"] = macd - self._macd_signal
+
+        window = np.fromiter(
+            (closes[i] for i in range(len(closes) - BB_WINDOW, len(closes))),
+            dtype=float,
+            count=BB_WINDOW,
+        )
+        mid = float(window.mean())
+        std = float(window.std(ddof=1))
+        row["BB_Upper"] = mid + BB_NUM_STD * std
+        row["BB_Middle"] = mid
+        row["BB_Lower"] = mid - BB_NUM_STD * std
+        row["BB_Width"] = (row["BB_Upper"] - row["BB_Lower"]) / mid
+
+        row["Daily_Return"] = (close / closes[-2] - 1) * 100
+        for lag in range(1, NUM_LAGS + 1):
+            row[f"Close_Lag_{lag}"] = closes[-1 - lag]
+
+        volume_sma = self._volume_sum / VOLUME_WINDOW
+        row[f"Volume_SMA_{VOLUME_WINDOW}"] = volume_sma
+        row["Volume_Ratio"] = row["Volume"] / volume_sma
+        return row
@@ -0,0 +1,237 @@
+"""
+jobs.py — Asynchronous Training Jobs
+=====================================
+Runs ``train_model`` in the background and tracks its progress.
+
+Jobs are recorded in a local SQLite database so that their status and
+results survive a restart of the API.  ``JobQueue.submit`` returns
+immediately with a job record; the training itself runs on a bounded
+executor (normally a process pool) and the worker writes its progress,
+final metrics or error back to the database.  A request for a ticker
+that already has a queued or running job with the same parameters joins
+that job instead of starting a second one.
+
+Author : Student ML Engineer
+Project: Stock Price Prediction System
+"""
+
+import os
+import json
+import uuid
+import sqlite3
+import logging
+import threading
+from datetime import datetime
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+JOBS_DB_PATH = os.getenv(
+    "STOCK_JOBS_DB",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "jobs.sqlite3"),
+)
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id          TEXT PRIMARY KEY,
+    ticker      TEXT NOT NULL,
+    params      TEXT NOT NULL,
+    status      TEXT NOT NULL,
+    progress    REAL NOT NULL DEFAULT 0,
+    stage       TEXT,
+    result      TEXT,
+    error       TEXT,
+    created_at  TEXT NOT NULL,
+    started_at  TEXT,
+    finished_at TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_ticker_status ON jobs (ticker, status);
+"""
+
+
+def _now() -> str:
+    return datetime.now().isoformat()
+
+
+class JobStore:
+    """
+    SQLite-backed job table, safe to use from several threads and processes.
+
+    Parameters
+    ----------
+    path : str
+        Database file; created on first use.
+    """
+
+    def __init__(self, path: str = JOBS_DB_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def create(self, ticker: str, params: dict) -> dict:
+        """Insert a new queued job and return it."""
+        job_id = uuid.uuid4().hex
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, ticker, params, status, created_at) VALUES (?, ?, ?, 'queued', ?)",
+                (job_id, ticker, json.dumps(params), _now()),
+            )
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> dict:
+        """Return a job as a dict, or None if it does not exist."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row is not None else None
+
+    def active(self, ticker: str = None) -> list:
+        """Queued or running jobs, oldest first (optionally for one ticker)."""
+        query = "SELECT * FROM jobs WHERE status IN ('queued', 'running')"
+        args = ()
+        if ticker is not None:
+            query += " AND ticker = ?"
+            args = (ticker,)
+        with self._connect() as conn:
+            rows = conn.execute(query + " ORDER BY created_at", args).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def update(self, job_id: str, **fields) -> None:
+        """Set the given columns of a job (``result`` is JSON-encoded)."""
+        if "result" in fields:
+            fields["result"] = json.dumps(fields["result"], default=float)
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._connect() as conn:
+            conn.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+    def delete(self, job_id: str) -> None:
+        """Remove a job record."""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> dict:
+        job = dict(row)
+        job["job_id"] = job.pop("id")
+        job["params"] = json.loads(job["params"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+
+def run_training_job(db_path: str, job_id: str, ticker: str, params: dict) -> None:
+    """
+    Worker entry point: run ``train_model`` and record the outcome.
+
+    Top-level so that it can be pickled into a process pool.
+    """
+    from src.train import train_model
+
+    store = JobStore(db_path)
+    store.update(job_id, status="running", started_at=_now(), stage="starting")
+
+    def progress(fraction: float, stage: str) -> None:
+        store.update(job_id, progress=round(fraction, 3), stage=stage)
+
+    try:
+        result = train_model(ticker, progress=progress, **params)
+    except Exception as exc:
+        logger.error("Training job %s for %s failed: %s", job_id, ticker, exc, exc_info=True)
+        store.update(job_id, status="failed", error=str(exc), finished_at=_now())
+        return
+
+    store.update(
+        job_id,
+        status="succeeded",
+        progress=1.0,
+        stage="done",
+        result=result,
+        finished_at=_now(),
+    )
+
+
+class JobQueue:
+    """
+    Submits training jobs to an executor, one active job per ticker and
+    parameter set.
+
+    Parameters
+    ----------
+    store : JobStore
+        Where jobs are recorded.
+    executor : BoundedExecutor
+        Pool the jobs run on; ``Saturated`` propagates from ``submit``.
+    """
+
+    def __init__(self, store: JobStore, executor):
+        self.store = store
+        self.executor = executor
+        self._lock = threading.Lock()
+
+    def submit(self, ticker: str, **params) -> tuple:
+        """
+        Enqueue a training job, or join an active job for ``ticker`` with
+        identical parameters.
+
+        Returns
+        -------
+        tuple of (job: dict, coalesced: bool)
+        """
+        ticker = ticker.upper()
+        # Compare in the form the parameters are stored in (JSON)
+        params = json.loads(json.dumps(params))
+        with self._lock:
+            for job in self.store.active(ticker):
+                if job["params"] == params:
+                    return job, True
+            job = self.store.create(ticker, params)
+            self._dispatch(job)
+        return job, False
+
+    def get(self, job_id: str) -> dict:
+        """Return a job record, or None if it does not exist."""
+        return self.store.get(job_id)
+
+    def recover(self) -> None:
+        """Re-dispatch jobs left queued or running by a previous process."""
+        for job in self.store.active():
+            logger.info("Resuming training job %s for %s", job["job_id"], job["ticker"])
+            self.store.update(job["job_id"], status="queued", progress=0.0, stage=None)
+            try:
+                self._dispatch(job, delete_on_reject=False)
+            except Exception as exc:
+                self.store.update(
+                    job["job_id"],
+                    status="failed",
+                    error=f"Could not resume after restart: {exc}",
+                    finished_at=_now(),
+                )
+
+    def _dispatch(self, job: dict, delete_on_reject: bool = True) -> None:
+        job_id = job["job_id"]
+        try:
+            future = self.executor.submit(
+                run_training_job, self.store.path, job_id, job["ticker"], job["params"],
+            )
+        except BaseException:
+            if delete_on_reject:
+                self.store.delete(job_id)
+            raise
+
+        def on_done(fut) -> None:
+            # The worker records its own failures; this catches crashed pools.
+            # Cancelled jobs stay queued and are resumed on the next start.
+            if fut.cancelled():
+                return
+            exc = fut.exception()
+            if exc is not None:
+                self.store.update(job_id, status="failed", error=str(exc), finished_at=_now())
+
+        future.add_done_callback(on_done)
@@ -0,0 +1,438 @@
+"""
+model_store.py — Model Artifact Storage
+========================================
+Writes and loads trained models.
+
+Every model is saved with ``joblib`` as ``<ticker>_model.pkl`` (the
+full scikit-learn object, used for retraining).  Tree models —
+``DecisionTreeRegressor`` and ``RandomForestRegressor`` — are also
+exported to ``<ticker>_model.flat``: every tree's node arrays
+concatenated into a few flat arrays in one uncompressed file.  The
+serving path loads that file with ``np.memmap``, so all processes on a
+host that serve the same model share its pages through the OS page
+cache instead of each holding a private unpickled copy of every tree.
+
+Flat file layout::
+
+    b"SPFLAT1\n" | uint64 header length | JSON header | arrays (64-byte aligned)
+
+The header records the dtype, shape and offset of each array.
+
+``FlatTreeEnsemble.predict`` walks the trees one after another, each
+over the whole batch (one tree level per NumPy step, or a Numba kernel
+when numba is installed), so a tree's nodes stay in cache while all
+rows pass through it.  Tree outputs are summed in tree order, like
+sklearn, so results are bit-identical to ``model.predict`` on the same
+(scaled) input.
+
+``fuse_scaler`` combines the MinMaxScaler with a trained model — a
+tree model keeps its scaled-space thresholds and applies the scaler's
+``scale_`` / ``min_`` first, exactly as ``scaler.transform`` does; a
+linear model gets the scaler folded into its coefficients — and
+``save_predictor`` writes the result, together with the model's
+metadata, to ``<ticker>_predictor.flat``: one self-contained file that
+predicts from raw (unscaled) feature rows.
+
+Author : Student ML Engineer
+Project: Stock Price Prediction System
+"""
+
+import os
+import json
+import struct
+import numpy as np
+
+from src.features import HAVE_NUMBA, _jit
+
+FLAT_MAGIC = b"SPFLAT1\n"
+FLAT_EXTENSION = ".flat"
+_ALIGN = 64
+_LEAF = -1  # sklearn.tree._tree.TREE_LEAF
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# Flat Tree Ensemble
+# ═══════════════════════════════════════════════════════════════════════════
+
+def _predict_trees_loop(X, left, right, feature, threshold, value, roots, out) -> None:
+    """Add every tree's leaf value for every row of ``X`` to ``out`` (Numba kernel)."""
+    # Trees outside, rows inside: one tree's nodes stay in cache for the
+    # whole batch, and each row still sums the trees in order
+    for t in range(roots.shape[0]):
+        for i in range(X.shape[0]):
+            node = roots[t]
+            while left[node] != -1:
+                if X[i, feature[node]] <= threshold[node]:
+                    node = left[node]
+                else:
+                    node = right[node]
+            for k in range(value.shape[1]):
+                out[i, k] += value[node, k]
+
+
+def _predict_trees_numpy(X, left, right, feature, threshold, value, roots) -> np.ndarray:
+    """Sum of every tree's leaf value per row; one tree at a time, all rows one level per step."""
+    rows = np.arange(X.shape[0])
+    out = np.zeros((X.shape[0], value.shape[1]))
+    for root in roots:
+        node = np.full(X.shape[0], root, dtype=np.int64)
+        while True:
+            children = left[node]
+            active = children != _LEAF
+            if not active.any():
+                break
+            go_left = X[rows, feature[node]] <= threshold[node]
+            node = np.where(active, np.where(go_left, children, right[node]), node)
+        # Added tree by tree, in the same order as sklearn
+        out += value[node]
+    return out
+
+
+class FlatTreeEnsemble:
+    """
+    Tree ensemble stored as flat node arrays; predictions average the
+    trees like ``RandomForestRegressor`` (a single tree is an ensemble
+    of one).
+
+    Parameters
+    ----------
+    arrays : dict of np.ndarray
+        ``left``, ``right`` (global child indices, -1 at leaves),
+        ``feature``, ``threshold``, ``value`` (n_nodes, n_outputs) and
+        ``roots`` (index of each tree's root node); optionally ``scale``
+        and ``shift``, a MinMaxScaler applied to inputs first (in their
+        dtype, like ``scaler.transform``).
+    n_features : int
+        Number of input features.
+    estimator : str
+        Class name of the model the arrays were exported from.
+    input_dtype : str
+        dtype inputs are compared in: "float32" mirrors sklearn.
+    """
+
+    kind = "trees"
+
+    def __init__(self, arrays: dict, n_features: int, estimator: str = "", input_dtype: str = "float32"):
+        # asarray drops the np.memmap subclass (for Numba) but keeps the mapping
+        self.left = np.asarray(arrays["left"])
+        self.right = np.asarray(arrays["right"])
+        self.feature = np.asarray(arrays["feature"])
+        self.threshold = np.asarray(arrays["threshold"])
+        self.value = np.asarray(arrays["value"])
+        self.roots = np.asarray(arrays["roots"])
+        self.scale = np.asarray(arrays["scale"]) if "scale" in arrays else None
+        self.shift = np.asarray(arrays["shift"]) if "shift" in arrays else None
+        self.n_features_in_ = n_features
+        self.n_outputs_ = self.value.shape[1]
+        self.estimator = estimator
+        self.input_dtype = input_dtype
+
+    @property
+    def arrays(self) -> dict:
+        arrays = {
+            "left": self.left,
+            "right": self.right,
+            "feature": self.feature,
+            "threshold": self.threshold,
+            "value": self.value,
+            "roots": self.roots,
+        }
+        if self.scale is not None:
+            arrays.update(scale=self.scale, shift=self.shift)
+        return arrays
+
+    def __repr__(self) -> str:
+        return (
+            f"FlatTreeEnsemble({self.estimator}, trees={len(self.roots)}, "
+            f"nodes={len(self.left)}, outputs={self.n_outputs_})"
+        )
+
+    def predict(self, X) -> np.ndarray:
+        """
+        Predict like the original estimator.
+
+        Returns shape (n_samples,) for one output, else (n_samples, n_outputs).
+        """
+        if self.scale is not None:
+            # Same operations and dtype as MinMaxScaler.transform
+            X = np.asarray(X, dtype=self.scale.dtype) * self.scale + self.shift
+        # sklearn trees compare float32 features against float64 thresholds
+        X = np.ascontiguousarray(X, dtype=self.input_dtype)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(
+                f"Expected input of shape (n_samples, {self.n_features_in_}), got {X.shape}."
+            )
+
+        arrays = (self.left, self.right, self.feature, self.threshold, self.value, self.roots)
+        if HAVE_NUMBA:
+            out = np.zeros((X.shape[0], self.n_outputs_))
+            _jit(_predict_trees_loop)(X, *arrays, out)
+        else:
+            out = _predict_trees_numpy(X, *arrays)
+        out /= len(self.roots)
+        return out[:, 0] if self.n_outputs_ == 1 else out
+
+
+class LinearPredictor:
+    """
+    ``X @ coef.T + intercept`` — a linear model exported to plain arrays.
+
+    Parameters
+    ----------
+    arrays : dict of np.ndarray
+        ``coef`` (n_features,) or (n_outputs, n_features) and ``intercept``.
+    n_features : int
+        Number of input features.
+    estimator : str
+        Class name of the model the arrays were exported from.
+    """
+
+    kind = "linear"
+
+    def __init__(self, arrays: dict, n_features: int, estimator: str = ""):
+        self.coef = arrays["coef"]
+        self.intercept = arrays["intercept"]
+        self.n_features_in_ = n_features
+        self.estimator = estimator
+
+    def __repr__(self) -> str:
+        return f"LinearPredictor({self.estimator}, features={self.n_features_in_})"
+
+    @property
+    def arrays(self) -> dict:
+        return {"coef": self.coef, "intercept": self.intercept}
+
+    def predict(self, X) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float64)
+        return X @ self.coef.T + self.intercept
+
+
+def is_tree_model(model) -> bool:
+    """True for the tree regressors that can be exported to the flat format."""
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.tree import DecisionTreeRegressor
+
+    return isinstance(model, (RandomForestRegressor, DecisionTreeRegressor))
+
+
+def flatten_trees(model) -> FlatTreeEnsemble:
+    """Export a fitted DecisionTreeRegressor / RandomForestRegressor."""
+    estimators = getattr(model, "estimators_", [model])
+    parts = {name: [] for name in ("left", "right", "feature", "threshold", "value")}
+    roots = []
+    offset = 0
+
+    for estimator in estimators:
+        tree = estimator.tree_
+        left = tree.children_left.astype(np.int64)
+        right = tree.children_right.astype(np.int64)
+        leaf = left == _LEAF
+        parts["left"].append(np.where(leaf, _LEAF, left + offset))
+        parts["right"].append(np.where(leaf, _LEAF, right + offset))
+        # Leaves get feature 0 so the arrays can be indexed without masking
+        parts["feature"].append(np.where(leaf, 0, tree.feature))
+        parts["threshold"].append(tree.threshold)
+        parts["value"].append(tree.value[:, :, 0])
+        roots.append(offset)
+        offset += tree.node_count
+
+    index_dtype = np.int32 if offset < 2**31 else np.int64
+    arrays = {
+        "left": np.concatenate(parts["left"]).astype(index_dtype),
+        "right": np.concatenate(parts["right"]).astype(index_dtype),
+        "feature": np.concatenate(parts["feature"]).astype(np.int32),
+        "threshold": np.concatenate(parts["threshold"]).astype(np.float64),
+        "value": np.ascontiguousarray(np.concatenate(parts["value"]), dtype=np.float64),
+        "roots": np.asarray(roots, dtype=np.int64),
+    }
+    return FlatTreeEnsemble(arrays, int(model.n_features_in_), type(model).__name__)
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# Flat File I/O
+# ═══════════════════════════════════════════════════════════════════════════
+
+def _aligned(n: int) -> int:
+    return (n + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def _write_arrays(path: str, arrays: dict, header: dict) -> None:
+    """Write named arrays plus a JSON header atomically (temp file + rename)."""
+    # Offsets are relative to the start of the data section
+    layout, offset = {}, 0
+    for name, arr in arrays.items():
+        layout[name] = {"dtype": arr.dtype.str, "shape": list(arr.shape), "offset": offset}
+        offset = _aligned(offset + arr.nbytes)
+
+    header = json.dumps({**header, "arrays": layout}, default=float).encode()
+    data_start = _aligned(len(FLAT_MAGIC) + 8 + len(header))
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as fh:
+        fh.write(FLAT_MAGIC + struct.pack("<Q", len(header)) + header)
+        for name, arr in arrays.items():
+            fh.seek(data_start + layout[name]["offset"])
+            fh.write(np.ascontiguousarray(arr).tobytes())
+        fh.truncate(data_start + offset)
+    os.replace(tmp_path, path)
+
+
+def _read_arrays(path: str) -> tuple:
+    """Memory-map a file written by ``_write_arrays``; returns (arrays, header)."""
+    with open(path, "rb") as fh:
+        if fh.read(len(FLAT_MAGIC)) != FLAT_MAGIC:
+            raise ValueError(f"{path} is not a flat model file.")
+        (header_len,) = struct.unpack("<Q", fh.read(8))
+        header = json.loads(fh.read(header_len))
+    data_start = _aligned(len(FLAT_MAGIC) + 8 + header_len)
+
+    buffer = np.memmap(path, dtype=np.uint8, mode="r")
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"]))
+        start = data_start + spec["offset"]
+        arrays[name] = buffer[start:start + count * dtype.itemsize].view(dtype).reshape(spec["shape"])
+    return arrays, header
+
+
+def _header(predictor) -> dict:
+    header = {
+        "kind": predictor.kind,
+        "estimator": predictor.estimator,
+        "n_features": predictor.n_features_in_,
+    }
+    if predictor.kind == "trees":
+        header["input_dtype"] = predictor.input_dtype
+    return header
+
+
+def _from_arrays(arrays: dict, header: dict):
+    if header.get("kind", "trees") == "linear":
+        return LinearPredictor(arrays, header["n_features"], header["estimator"])
+    return FlatTreeEnsemble(
+        arrays, header["n_features"], header["estimator"], header.get("input_dtype", "float32"),
+    )
+
+
+def save_flat(ensemble: FlatTreeEnsemble, path: str) -> None:
+    """Write ``ensemble`` to ``path`` atomically (temp file + rename)."""
+    _write_arrays(path, ensemble.arrays, _header(ensemble))
+
+
+def load_flat(path: str) -> FlatTreeEnsemble:
+    """Memory-map a file written by ``save_flat`` (read-only, shared pages)."""
+    return _from_arrays(*_read_arrays(path))
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# Fused Predictors
+# ═══════════════════════════════════════════════════════════════════════════
+
+def fuse_scaler(model, scaler):
+    """
+    Combine a fitted MinMaxScaler with ``model``.
+
+    The scaler maps ``x`` to ``x * scale_ + min_``.  A tree model keeps
+    its thresholds and stores ``scale_`` / ``min_`` to apply first:
+    folding them into the thresholds would compare raw values where
+    sklearn compares float32-rounded scaled ones, which sends samples
+    near a split down the other branch.  A linear model folds them into
+    its coefficients, ``(coef * scale_) · x + (coef · min_ + b)``, which
+    only differs from the original by floating-point rounding.
+
+    The returned predictor takes raw feature rows.
+
+    Returns
+    -------
+    FlatTreeEnsemble or LinearPredictor
+    """
+    if is_tree_model(model):
+        flat = flatten_trees(model)
+        # Keep the scaler's dtype: a float32 scaler scales in float32
+        arrays = {**flat.arrays, "scale": np.asarray(scaler.scale_), "shift": np.asarray(scaler.min_)}
+        return FlatTreeEnsemble(arrays, flat.n_features_in_, flat.estimator)
+
+    scale = np.asarray(scaler.scale_, dtype=np.float64)
+    shift = np.asarray(scaler.min_, dtype=np.float64)
+
+    if hasattr(model, "coef_") and hasattr(model, "intercept_"):
+        coef = np.asarray(model.coef_, dtype=np.float64)
+        intercept = np.asarray(model.intercept_, dtype=np.float64)
+        arrays = {"coef": coef * scale, "intercept": intercept + coef @ shift}
+        return LinearPredictor(arrays, len(scale), type(model).__name__)
+
+    raise TypeError(f"Cannot fuse a scaler into {type(model).__name__}.")
+
+
+def predictor_path_for(model_path: str) -> str:
+    """``<ticker>_model.pkl`` → ``<ticker>_predictor.flat``."""
+    base = os.path.splitext(model_path)[0]
+    return base[: -len("_model")] + "_predictor" + FLAT_EXTENSION
+
+
+def save_predictor(predictor, path: str, meta: dict) -> None:
+    """Write a fused predictor and the model's metadata to one file."""
+    _write_arrays(path, predictor.arrays, {**_header(predictor), "meta": meta})
+
+
+def load_predictor(path: str) -> tuple:
+    """
+    Memory-map a file written by ``save_predictor``.
+
+    Returns
+    -------
+    tuple of (predictor, meta: dict)
+    """
+    arrays, header = _read_arrays(path)
+    return _from_arrays(arrays, header), header["meta"]
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# Model Artifacts
+# ═══════════════════════════════════════════════════════════════════════════
+
+def flat_path_for(model_path: str) -> str:
+    """``<ticker>_model.pkl`` → ``<ticker>_model.flat``."""
+    return os.path.splitext(model_path)[0] + FLAT_EXTENSION
+
+
+def save_model(model, model_path: str) -> None:
+    """
+    Save ``model`` to ``model_path`` (joblib) and, for tree models, the
+    flat serving copy next to it; a stale flat copy is removed otherwise.
+    """
+    import joblib
+
+    tmp_path = model_path + ".tmp"
+    joblib.dump(model, tmp_path)
+    os.replace(tmp_path, model_path)
+
+    # Written second so that it is never older than the pickle it mirrors
+    flat_path = flat_path_for(model_path)
+    if is_tree_model(model):
+        save_flat(flatten_trees(model), flat_path)
+    elif os.path.exists(flat_path):
+        os.remove(flat_path)
+
+
+def serving_path(model_path: str) -> str:
+    """
+    File the serving path should load: the flat copy, unless it is missing
+    or older than the pickle (e.g. the pickle was rewritten by a notebook).
+    """
+    flat_path = flat_path_for(model_path)
+    try:
+        if os.stat(flat_path).st_mtime_ns >= os.stat(model_path).st_mtime_ns:
+            return flat_path
+    except FileNotFoundError:
+        pass
+    return model_path
+
+
+def load_model(path: str):
+    """Load a model file written by ``save_model``."""
+    if path.endswith(FLAT_EXTENSION):
+        return load_flat(path)
+    import joblib
+    return joblib.load(path)
@@ -8,60 +8,187 @@ Project: Stock Price Prediction System
 """
 
 import os
+import time
 import logging
 import numpy as np
 import pandas as pd
-import joblib
-from datetime import datetime, timedelta
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta, timezone
 
+from src.artifact_cache import ArtifactCache, TTLCache
+from src.concurrency import Saturated, SingleFlight
 from src.data_fetch import fetch_stock_data
-from src.features import add_all_technical_indicators, prepare_features, scale_features
+from src.feature_store import feature_store
+from src.features import scale_features
+from src.indicator_state import IndicatorState
+from src.model_store import load_model, load_predictor, predictor_path_for, serving_path
 
 # ---------------------------------------------------------------------------
 # Constants
 # ---------------------------------------------------------------------------
 MODELS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "models")
+BATCH_MAX_WORKERS = 8  # tickers of one predict_batch call in flight at once
+ARTIFACT_CACHE_MAX_ENTRIES = 32
+ARTIFACT_CACHE_MAX_BYTES = 1 << 30  # 1 GiB of pickled artifacts
+PREDICT_DATA_MAX_AGE_HOURS = 0.25  # delta-refresh price data older than this
+RESULT_CACHE_MAX_ENTRIES = 1024
+BAR_CLOSE_UTC_HOUR = 21  # daily bars close at 16:00 New York ≈ 21:00 UTC
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 logger = logging.getLogger(__name__)
 
+artifact_cache = ArtifactCache(
+    max_entries=ARTIFACT_CACHE_MAX_ENTRIES,
+    max_bytes=ARTIFACT_CACHE_MAX_BYTES,
+)
+# Finished forecasts, keyed by (ticker, days_ahead); see predict_stock
+result_cache = TTLCache(max_entries=RESULT_CACHE_MAX_ENTRIES)
+_in_flight = SingleFlight()
+_batch_pool = None  # default executor of predict_batch, created on first use
+
+
+def _artifact_paths(ticker: str) -> list:
+    """
+    Files a ticker's predictions are served from.
+
+    The fused ``<ticker>_predictor.flat`` (model, scaler and metadata in
+    one file) when it is at least as new as the pickles it was exported
+    from; otherwise the model (its memory-mapped ``.flat`` export when one
+    exists), scaler and metadata files (see ``src.model_store``).
+    ``export_predictor`` only writes the fused file when it matches
+    ``model.predict``.
+    """
+    safe_ticker = ticker.upper().replace("/", "_")
+    model_path, scaler_path, meta_path = [
+        os.path.join(MODELS_DIR, f"{safe_ticker}_{kind}.pkl")
+        for kind in ("model", "scaler", "meta")
+    ]
+    try:
+        fused_mtime = os.stat(predictor_path_for(model_path)).st_mtime_ns
+        if all(fused_mtime >= os.stat(p).st_mtime_ns for p in (model_path, scaler_path, meta_path)):
+            return [predictor_path_for(model_path)]
+    except FileNotFoundError:
+        pass
+    return [serving_path(model_path), scaler_path, meta_path]
+
 
 def _load_artifacts(ticker: str) -> tuple:
     """
     Load model, scaler, and metadata for a ticker.
 
+    Bundles are served from ``artifact_cache`` and reloaded only when one
+    of the files changes on disk.  Tree models are memory-mapped, so their
+    pages are shared with every other process serving the same file.
+
     Returns
     -------
     tuple of (model, scaler, metadata_dict)
+        ``scaler`` is None for a fused predictor, which takes raw features.
     """
     safe_ticker = ticker.upper().replace("/", "_")
-    model_path = os.path.join(MODELS_DIR, f"{safe_ticker}_model.pkl")
-    scaler_path = os.path.join(MODELS_DIR, f"{safe_ticker}_scaler.pkl")
-    meta_path = os.path.join(MODELS_DIR, f"{safe_ticker}_meta.pkl")
+    paths = _artifact_paths(ticker)
 
-    if not os.path.exists(model_path):
+    if not os.path.exists(paths[0]):
         raise FileNotFoundError(
             f"No trained model found for '{ticker}'. "
             f"Please train the model first using train.py."
         )
 
-    model = joblib.load(model_path)
-    scaler = joblib.load(scaler_path)
-    meta = joblib.load(meta_path)
+    def load():
+        if len(paths) == 1:
+            predictor, meta = load_predictor(paths[0])
+            return predictor, None, meta
+        import joblib  # deferred: also pulls in scikit-learn via unpickling
+        model_path, scaler_path, meta_path = paths
+        return load_model(model_path), joblib.load(scaler_path), joblib.load(meta_path)
+
+    return artifact_cache.get(safe_ticker, paths, load)
+
+
+def _model_input(scaler, row, dtype):
+    """Scale a feature row for the model; fused predictors take it raw."""
+    if scaler is None:
+        return row
+    return scale_features(row, scaler=scaler, dtype=dtype)[0]
+
+
+def _next_business_day(date):
+    """Return the next weekday after ``date``."""
+    next_date = date + timedelta(days=1)
+    while next_date.weekday() >= 5:  # skip weekends
+        next_date += timedelta(days=1)
+    return next_date
+
+
+def _feature_dtype(meta: dict):
+    """float32 for models trained with ``train_model(float32=True)``, else None."""
+    return np.float32 if meta.get("dtype") == "float32" else None
+
+
+def _horizon_error(meta: dict, days_ahead: int):
+    """ValueError if a direct model cannot forecast ``days_ahead`` days, else None."""
+    if meta.get("forecast_mode") != "direct" or days_ahead <= meta["horizon"]:
+        return None
+    return ValueError(
+        f"Model for '{meta['ticker']}' was trained for a {meta['horizon']}-day horizon; "
+        f"retrain with a longer horizon to predict {days_ahead} days."
+    )
 
-    return model, scaler, meta
+
+def _predict_direct(model, scaler, meta: dict, enriched: pd.DataFrame, days_ahead: int) -> list:
+    """Whole forecast from one multi-output ``predict`` on the latest feature row."""
+    error = _horizon_error(meta, days_ahead)
+    if error is not None:
+        raise error
+    last_row = enriched.iloc[[-1]][meta["feature_names"]]
+    if scaler is None:
+        last_row = last_row.to_numpy(dtype=np.float64)
+    model_input = _model_input(scaler, last_row, _feature_dtype(meta))
+    prices = np.asarray(model.predict(model_input)).reshape(-1)[:days_ahead]
+
+    predictions = []
+    date = enriched.index[-1]
+    for price in prices:
+        date = _next_business_day(date)
+        predictions.append({"date": date.strftime("%Y-%m-%d"), "close": round(float(price), 2)})
+    return predictions
+
+
+def _result_expiry(now: datetime) -> float:
+    """
+    Epoch time at which a forecast made at ``now`` goes stale.
+
+    That is the next daily bar close, or ``PREDICT_DATA_MAX_AGE_HOURS``
+    from now while the current bar is still forming, whichever is sooner.
+    """
+    boundary = now.replace(hour=BAR_CLOSE_UTC_HOUR, minute=0, second=0, microsecond=0)
+    if boundary <= now:
+        boundary += timedelta(days=1)
+    refresh = now + timedelta(hours=PREDICT_DATA_MAX_AGE_HOURS)
+    return min(boundary, refresh).timestamp()
 
 
 def predict_stock(ticker: str, days_ahead: int = 5) -> dict:
     """
     Predict future stock prices for the next N trading days.
 
-    The model uses a recursive (autoregressive) strategy:
+    Results are cached per (ticker, days_ahead) until ``_result_expiry``
+    or until the model files change, and concurrent identical requests
+    share a single computation.  The returned dict is shared between
+    callers and must not be mutated.
+
+    Models trained with a ``horizon`` (direct mode) return every day of
+    the forecast from a single ``predict`` call on the latest feature row.
+    Otherwise the model uses a recursive (autoregressive) strategy:
       1. Use the latest available row of features to predict the next Close.
       2. Shift the data forward — the predicted Close becomes the new
-         'Close' value, and all indicators are recomputed.
+         'Close' value, and the indicator state is advanced by one bar.
       3. Repeat for each day in the forecast horizon.
 
+    Indicators are seeded once from the stored indicator frame (see
+    ``feature_store`` and ``IndicatorState``), so each forecast step
+    costs O(1) instead of a full recomputation.
+
     Parameters
     ----------
     ticker : str
@@ -80,15 +207,37 @@ def predict_stock(ticker: str, days_ahead: int = 5) -> dict:
             "predictions": [{"date": str, "close": float}, ...]
         }
     """
+    key = (ticker.upper(), days_ahead)
+    # Read the file signature before loading, so that a model swapped in
+    # by a retrain mid-request cannot be cached under the new signature
+    try:
+        signature = ArtifactCache._signature(_artifact_paths(ticker))
+    except FileNotFoundError:
+        signature = None  # not trained; _predict_stock raises
+    if signature is not None:
+        cached = result_cache.get(key, signature=signature)
+        if cached is not None:
+            return cached
+
+    def compute() -> dict:
+        result = _predict_stock(ticker, days_ahead)
+        if signature is not None:
+            result_cache.put(key, result, _result_expiry(datetime.now(timezone.utc)), signature=signature)
+        return result
+
+    result, _ = _in_flight.do((key, signature), compute)
+    return result
+
+
+def _predict_stock(ticker: str, days_ahead: int) -> dict:
+    """Uncached implementation of ``predict_stock``."""
     # ── Load artifacts ────────────────────────────────────────────────────
     model, scaler, meta = _load_artifacts(ticker)
     feature_names = meta["feature_names"]
     logger.info("Loaded model '%s' for %s", meta["best_model"], ticker)
 
     # ── Fetch latest data ─────────────────────────────────────────────────
-    df = fetch_stock_data(ticker, period="2y", use_cache=False)
-    df_enriched = add_all_technical_indicators(df)
-    df_enriched = df_enriched.dropna()
+    df = fetch_stock_data(ticker, period="2y", max_age_hours=PREDICT_DATA_MAX_AGE_HOURS)
 
     # ── Prepare history (last 60 trading days) ────────────────────────────
     history_df = df.tail(60)
@@ -97,46 +246,55 @@ def predict_stock(ticker: str, days_ahead: int = 5) -> dict:
         for d, row in history_df.iterrows()
     ]
 
+    # Indicators over the ticker's stored history; only the latest rows are used
+    enriched = feature_store.indicators(ticker, df)
+    if meta.get("forecast_mode") == "direct":
+        predictions = _predict_direct(model, scaler, meta, enriched, days_ahead)
+        logger.info("Generated %d-day direct forecast for %s", days_ahead, ticker)
+        return {
+            "ticker": ticker.upper(),
+            "model_used": meta["best_model"],
+            "metrics": meta["metrics"],
+            "history": history,
+            "predictions": predictions,
+        }
+
     # ── Recursive prediction ──────────────────────────────────────────────
     predictions = []
-    working_df = df.copy()
-    last_date = working_df.index[-1]
+    state = IndicatorState(enriched)
+    last_date = df.index[-1]
 
+    dtype = _feature_dtype(meta) if scaler is not None else None
     for day in range(1, days_ahead + 1):
-        # Recompute indicators on the working data
-        enriched = add_all_technical_indicators(working_df)
-        enriched = enriched.dropna()
-
-        # Extract the last row of features
-        last_row = enriched[feature_names].iloc[[-1]]
-        last_scaled = scaler.transform(last_row)
+        # Extract the latest row of features from the running state
+        features = state.feature_row()
+        values = [[features[c] for c in feature_names]]
+        if scaler is not None and dtype is None:
+            # float64 scalers were fitted on DataFrames and expect column names
+            last_row = pd.DataFrame(values, columns=feature_names)
+        else:
+            last_row = np.array(values, dtype=dtype or np.float64)
+        last_scaled = _model_input(scaler, last_row, dtype)
 
         # Predict
         pred_price = float(model.predict(last_scaled)[0])
 
         # Compute next business date
-        next_date = last_date + timedelta(days=1)
-        while next_date.weekday() >= 5:  # skip weekends
-            next_date += timedelta(days=1)
+        next_date = _next_business_day(last_date)
 
         predictions.append({
             "date": next_date.strftime("%Y-%m-%d"),
             "close": round(pred_price, 2),
         })
 
-        # Append the predicted row to working_df for next iteration
-        new_row = pd.DataFrame({
-            "Open": [pred_price],
-            "High": [pred_price * 1.005],   # slight estimate
-            "Low": [pred_price * 0.995],
-            "Close": [pred_price],
-            "Volume": [working_df["Volume"].tail(5).mean()],
-        }, index=[next_date])
-
-        if "Adj Close" in working_df.columns:
-            new_row["Adj Close"] = pred_price
-
-        working_df = pd.concat([working_df, new_row])
+        # Advance the indicator state with the predicted bar
+        state.update(
+            open_=pred_price,
+            high=pred_price * 1.005,   # slight estimate
+            low=pred_price * 0.995,
+            close=pred_price,
+            volume=state.recent_volume_mean(5),
+        )
         last_date = next_date
 
     logger.info("Generated %d-day forecast for %s", days_ahead, ticker)
@@ -150,6 +308,189 @@ def predict_stock(ticker: str, days_ahead: int = 5) -> dict:
     }
 
 
+def _predict_horizons(ticker: str, days: list) -> tuple:
+    """
+    One forecast serving every horizon in ``days`` that the model supports.
+
+    Returns
+    -------
+    tuple of (result: dict | None, errors: dict of days_ahead → ValueError)
+    """
+    _, _, meta = _load_artifacts(ticker)
+    errors = {d: _horizon_error(meta, d) for d in days}
+    errors = {d: exc for d, exc in errors.items() if exc is not None}
+    supported = [d for d in days if d not in errors]
+    if not supported:
+        return None, errors
+    return predict_stock(ticker, max(supported)), errors
+
+
+def predict_batch(requests: list, executor=None, max_workers: int = BATCH_MAX_WORKERS):
+    """
+    Predict many (ticker, days_ahead) pairs concurrently.
+
+    Requests are grouped by ticker so that each ticker's data is fetched
+    and its artifacts are loaded only once per batch.  The recursive
+    forecast for a shorter horizon is a prefix of the longest one, so a
+    single forecast per ticker serves every horizon requested for it.
+    For a direct model that forecast is capped at the model's horizon;
+    only the requests beyond it fail.
+
+    The first ``max_workers`` tickers are submitted before this function
+    returns; the rest follow as those finish.  With a ``BoundedExecutor``
+    a full pool raises ``Saturated`` here when no ticker could be
+    submitted, and fails later tickers with ``Saturated`` if the pool
+    stays full while none of the batch's own tickers are running.
+
+    Parameters
+    ----------
+    requests : list of (str, int)
+        Ticker symbols paired with the number of days to predict.
+    executor : concurrent.futures.Executor or None
+        Pool the tickers run on (the API passes its bounded I/O pool);
+        None uses a module-level thread pool shared by all calls.
+    max_workers : int
+        Tickers of this batch running or queued on ``executor`` at once.
+
+    Returns
+    -------
+    iterator of (ticker: str, days_ahead: int, result: dict | None, error: Exception | None)
+        One item per request, in completion order.  Exactly one of
+        ``result`` (as returned by ``predict_stock``) or ``error`` is set.
+    """
+    global _batch_pool
+    if executor is None:
+        if _batch_pool is None:
+            _batch_pool = ThreadPoolExecutor(max_workers=BATCH_MAX_WORKERS, thread_name_prefix="predict-batch")
+        executor = _batch_pool
+
+    horizons = {}
+    for ticker, days_ahead in requests:
+        horizons.setdefault(ticker.upper(), []).append(days_ahead)
+
+    queue = list(horizons)
+    running = {}  # future -> ticker
+    failed = []  # (ticker, exception) rejected by a saturated pool
+
+    def fill() -> None:
+        while queue and len(running) < max(1, max_workers):
+            ticker = queue[0]
+            try:
+                future = executor.submit(_predict_horizons, ticker, horizons[ticker])
+            except Saturated as exc:
+                if running:
+                    return  # retry when one of ours finishes
+                failed.append((queue.pop(0), exc))
+                continue
+            running[future] = queue.pop(0)
+
+    fill()
+    if failed and not running:
+        raise failed[0][1]  # nothing of the batch could start
+
+    def results():
+        try:
+            while running or failed:
+                for ticker, exc in failed:
+                    for days_ahead in horizons[ticker]:
+                        yield ticker, days_ahead, None, exc
+                failed.clear()
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    ticker = running.pop(future)
+                    try:
+                        result, errors = future.result()
+                    except Exception as exc:
+                        logger.warning("Batch prediction failed for %s: %s", ticker, exc)
+                        for days_ahead in horizons[ticker]:
+                            yield ticker, days_ahead, None, exc
+                        continue
+
+                    for days_ahead in horizons[ticker]:
+                        if days_ahead in errors:
+                            yield ticker, days_ahead, None, errors[days_ahead]
+                            continue
+                        yield ticker, days_ahead, {
+                            **result,
+                            "predictions": result["predictions"][:days_ahead],
+                        }, None
+                fill()
+        finally:
+            # Stop queued work if the consumer goes away early
+            for future in running:
+                future.cancel()
+
+    return results()
+
+
+def available_tickers() -> list:
+    """Tickers that have a trained model in ``MODELS_DIR``."""
+    if not os.path.isdir(MODELS_DIR):
+        return []
+    return sorted(
+        name[: -len("_model.pkl")]
+        for name in os.listdir(MODELS_DIR)
+        if name.endswith("_model.pkl") and not name.endswith("_direction_model.pkl")
+    )
+
+
+def _warm_up_ticker(ticker: str) -> None:
+    """Load one ticker's artifacts, data and features and run one inference."""
+    model, scaler, meta = _load_artifacts(ticker)
+    df = fetch_stock_data(ticker, period="2y", max_age_hours=PREDICT_DATA_MAX_AGE_HOURS)
+    enriched = feature_store.indicators(ticker, df)
+    last_row = enriched.iloc[[-1]][meta["feature_names"]]
+    if scaler is None:
+        last_row = last_row.to_numpy(dtype=np.float64)
+    model.predict(_model_input(scaler, last_row, _feature_dtype(meta)))
+
+
+def warm_up(tickers: list = None, max_workers: int = BATCH_MAX_WORKERS) -> dict:
+    """
+    Preload everything the first prediction for each ticker would need.
+
+    Loads the artifacts into ``artifact_cache``, primes the price-data
+    cache and the feature store, and runs one inference per model so
+    that lazy initialisation inside NumPy / scikit-learn happens now.
+
+    Parameters
+    ----------
+    tickers : list of str or None
+        Tickers to warm up (None = every model in ``MODELS_DIR``).
+    max_workers : int
+        Number of tickers warmed up in parallel.
+
+    Returns
+    -------
+    dict
+        ticker → {"status": "ok" | "failed", "seconds": float, "error": str}
+    """
+    if tickers is None:
+        tickers = available_tickers()
+    tickers = list(dict.fromkeys(t.upper() for t in tickers))
+    if not tickers:
+        return {}
+
+    def run(ticker: str) -> dict:
+        start = time.perf_counter()
+        try:
+            _warm_up_ticker(ticker)
+        except Exception as exc:
+            logger.warning("Warm-up failed for %s: %s", ticker, exc)
+            return {"status": "failed", "seconds": round(time.perf_counter() - start, 3), "error": str(exc)}
+        return {"status": "ok", "seconds": round(time.perf_counter() - start, 3)}
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tickers)))) as pool:
+        results = dict(zip(tickers, pool.map(run, tickers)))
+
+    ok = sum(r["status"] == "ok" for r in results.values())
+    logger.info("Warm-up complete: %d/%d tickers ready", ok, len(tickers))
+    return results
+
+
 def get_historical_data(ticker: str, days: int = 90) -> list:
     """
     Return recent historical closing prices for charting.
@@ -9,6 +9,10 @@ Regression models (price prediction):
 Classification model (direction prediction):
   • Logistic Regression (Up / Down)
 
+With ``horizon=H`` the regression models are trained in direct
+multi-horizon mode: one multi-output model whose targets are Close at
+t+1 … t+H, so a whole forecast is a single ``predict`` call.
+
 Author : Student ML Engineer
 Project: Stock Price Prediction System
 """
@@ -19,16 +23,18 @@ import numpy as np
 import pandas as pd
 import joblib
 
-from sklearn.linear_model import LinearRegression, LogisticRegression
+from sklearn.linear_model import LogisticRegression
 from sklearn.tree import DecisionTreeRegressor
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_squared_error, mean_absolute_error, accuracy_score
 from sklearn.model_selection import TimeSeriesSplit, RandomizedSearchCV
 
 from src.data_fetch import fetch_stock_data
+from src.feature_store import feature_store
+from src.incremental import IncrementalLinearRegression
+from src.model_store import fuse_scaler, predictor_path_for, save_model, save_predictor
+from src.tuning import successive_halving_search
 from src.features import (
-    add_all_technical_indicators,
-    prepare_features,
     scale_features,
     time_based_split,
 )
@@ -38,6 +44,28 @@ from src.features import (
 # ---------------------------------------------------------------------------
 MODELS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "models")
 RANDOM_SEED = 42
+MAX_DIRECT_HORIZON = 30  # longest horizon the API can request
+# Train and serve on float32 feature matrices (half the memory, no
+# float64 → float32 copy inside the trees); recorded per model in meta
+FLOAT32 = os.getenv("STOCK_FLOAT32", "0") == "1"
+# Random Forest search: "random" (RandomizedSearchCV) or "halving"
+# (successive halving, opt-in).  On AAPL 5y with one core, halving took
+# 53s vs. 104s but reached a held-out RMSE of 11.12 vs. 11.01.
+TUNE_METHOD = os.getenv("STOCK_TUNE_METHOD", "random")
+TUNED_N_ESTIMATORS = 300  # forest size of the final tuned model (halving search)
+
+# Incremental retraining (train_model(..., incremental=True))
+INCREMENTAL_WINDOW = 252  # recent bars the added Random Forest trees are fitted on
+INCREMENTAL_TREES = 20  # trees added per incremental update
+INCREMENTAL_MAX_TREES = 500  # oldest trees are dropped beyond this
+# Drift thresholds — crossing any of them forces a full refit
+DRIFT_MAX_BARS = 63  # bars absorbed incrementally since the last full fit
+DRIFT_RMSE_RATIO = 2.0  # RMSE on the new bars vs. the full fit's test RMSE
+DRIFT_MIN_BARS = 5  # fewer new bars than this are too noisy for the RMSE check
+DRIFT_OUT_OF_RANGE = 0.5  # share of new feature values outside the range seen so far
+# Fused predictor export (export_predictor)
+PARITY_ROWS = 500  # rows the fused predictor is checked on before export
+PARITY_TOLERANCE = 1e-6  # linear models: max error relative to the largest prediction
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 logger = logging.getLogger(__name__)
@@ -74,14 +102,40 @@ def compute_metrics(y_true: np.ndarray, y_pred: np.ndarray) -> dict:
     }
 
 
+def compute_horizon_metrics(y_true: np.ndarray, y_pred: np.ndarray) -> dict:
+    """
+    Metrics for a direct multi-horizon model.
+
+    Reports ``compute_metrics`` for the t+1 column, plus the RMSE of every
+    horizon and their mean (used to rank models).
+    """
+    metrics = compute_metrics(y_true[:, 0], y_pred[:, 0])
+    horizon_rmse = np.sqrt(np.mean((y_true - y_pred) ** 2, axis=0))
+    metrics["horizon_rmse"] = [round(float(v), 4) for v in horizon_rmse]
+    metrics["mean_horizon_rmse"] = round(float(horizon_rmse.mean()), 4)
+    return metrics
+
+
+def direct_targets(y: pd.Series, horizon: int) -> pd.DataFrame:
+    """Targets for direct training: column h-1 holds the value at t+h."""
+    return pd.concat(
+        {f"{y.name}_t+{h}": y.shift(-h) for h in range(1, horizon + 1)},
+        axis=1,
+    )
+
+
 # ═══════════════════════════════════════════════════════════════════════════
 # Model Definitions
 # ═══════════════════════════════════════════════════════════════════════════
 
-def _get_regression_models() -> dict:
-    """Return a dictionary of candidate regression models for price prediction."""
+def _get_regression_models(n_jobs: int = -1) -> dict:
+    """
+    Return a dictionary of candidate regression models for price prediction.
+
+    ``n_jobs`` is the number of cores the Random Forest may use.
+    """
     return {
-        "LinearRegression": LinearRegression(),
+        "LinearRegression": IncrementalLinearRegression(),
         "DecisionTree": DecisionTreeRegressor(
             max_depth=10,
             min_samples_split=10,
@@ -93,7 +147,7 @@ def _get_regression_models() -> dict:
             max_depth=15,
             min_samples_split=5,
             random_state=RANDOM_SEED,
-            n_jobs=-1,
+            n_jobs=n_jobs,
         ),
     }
 
@@ -111,9 +165,25 @@ def _get_direction_model() -> LogisticRegression:
 # Hyperparameter Tuning (Random Forest)
 # ═══════════════════════════════════════════════════════════════════════════
 
-def tune_random_forest(X_train: np.ndarray, y_train: np.ndarray) -> RandomForestRegressor:
+def tune_random_forest(
+    X_train: np.ndarray,
+    y_train: np.ndarray,
+    n_jobs: int = -1,
+    method: str = TUNE_METHOD,
+    cache_path: str = None,
+) -> RandomForestRegressor:
     """
-    Tune Random Forest using TimeSeriesSplit + RandomizedSearchCV.
+    Tune Random Forest with TimeSeriesSplit cross-validation.
+
+    ``method="random"`` (the default) runs the full RandomizedSearchCV.
+    ``method="halving"`` runs ``successive_halving_search`` (see
+    ``src.tuning``), which eliminates weak candidates on small forests and
+    short training windows, caches fold scores in ``cache_path`` and
+    starts from the previous best parameters: about twice as fast, with a
+    slightly worse held-out RMSE in our measurements (see ``TUNE_METHOD``).
+
+    The search fits candidates on ``n_jobs`` cores and each candidate forest
+    uses a single core, so the two levels never multiply the core count.
 
     Returns
     -------
@@ -121,15 +191,39 @@ def tune_random_forest(X_train: np.ndarray, y_train: np.ndarray) -> RandomForest
         Best estimator from the search.
     """
     param_distributions = {
-        "n_estimators": [100, 200, 300, 500],
         "max_depth": [5, 10, 15, 20, None],
         "min_samples_split": [2, 5, 10],
         "min_samples_leaf": [1, 2, 4],
         "max_features": ["sqrt", "log2", 0.5, 0.8],
     }
 
+    if method == "halving":
+        logger.info("Starting Random Forest hyperparameter tuning (successive halving)...")
+        best_params, best_rmse = successive_halving_search(
+            X_train,
+            y_train,
+            param_distributions,
+            n_jobs=n_jobs,
+            cache_path=cache_path,
+            random_state=RANDOM_SEED,
+        )
+        logger.info("Best params: %s", best_params)
+        logger.info("Best CV RMSE: %.4f", best_rmse)
+
+        best_model = RandomForestRegressor(
+            n_estimators=TUNED_N_ESTIMATORS,
+            random_state=RANDOM_SEED,
+            n_jobs=n_jobs,
+            **best_params,
+        )
+        return best_model.fit(X_train, y_train)
+    if method != "random":
+        raise ValueError(f"Unknown tuning method {method!r}; use 'halving' or 'random'.")
+
+    param_distributions["n_estimators"] = [100, 200, 300, 500]
+
     tscv = TimeSeriesSplit(n_splits=5)
-    base_model = RandomForestRegressor(random_state=RANDOM_SEED, n_jobs=-1)
+    base_model = RandomForestRegressor(random_state=RANDOM_SEED, n_jobs=1)
 
     search = RandomizedSearchCV(
         estimator=base_model,
@@ -138,7 +232,7 @@ def tune_random_forest(X_train: np.ndarray, y_train: np.ndarray) -> RandomForest
         cv=tscv,
         scoring="neg_root_mean_squared_error",
         random_state=RANDOM_SEED,
-        n_jobs=-1,
+        n_jobs=n_jobs,
         verbose=0,
     )
 
@@ -147,7 +241,181 @@ def tune_random_forest(X_train: np.ndarray, y_train: np.ndarray) -> RandomForest
     logger.info("Best params: %s", search.best_params_)
     logger.info("Best CV RMSE: %.4f", -search.best_score_)
 
-    return search.best_estimator_
+    best_model = search.best_estimator_
+    best_model.set_params(n_jobs=n_jobs)  # refit used 1 core; predict with the budget
+    return best_model
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# Predictor Export
+# ═══════════════════════════════════════════════════════════════════════════
+
+def export_predictor(model, scaler, meta: dict, model_path: str, X_check: pd.DataFrame, dtype=None) -> None:
+    """
+    Write ``<ticker>_predictor.flat``: the model with the scaler folded in,
+    plus its metadata, as one memory-mapped file that ``src.predict``
+    loads instead of the model, scaler and metadata pickles.
+
+    The fused predictor is first compared with ``model.predict`` on the
+    last ``PARITY_ROWS`` rows of ``X_check`` (raw features); tree models
+    must match exactly, linear ones within ``PARITY_TOLERANCE``.  If it
+    does not, no predictor is written and serving keeps using the model
+    and scaler files.
+
+    Written after the other artifacts, so it is never older than them.
+    """
+    path = predictor_path_for(model_path)
+    try:
+        predictor = fuse_scaler(model, scaler)
+    except TypeError as exc:
+        predictor, reason = None, str(exc)
+    else:
+        X_check = X_check.iloc[-PARITY_ROWS:]
+        expected = np.asarray(model.predict(scale_features(X_check, scaler=scaler, dtype=dtype)[0]))
+        # Serving passes raw rows as float64
+        actual = predictor.predict(X_check.to_numpy(dtype=np.float64))
+        error = float(np.max(np.abs(actual - expected), initial=0.0))
+        allowed = 0.0
+        if predictor.kind == "linear":
+            allowed = PARITY_TOLERANCE * float(np.max(np.abs(expected), initial=1.0))
+        reason = None if error <= allowed else f"differs from model.predict by up to {error:.3g}"
+
+    if reason is not None:
+        logger.warning("No fused predictor for %s: %s", os.path.basename(model_path), reason)
+        if os.path.exists(path):
+            os.remove(path)
+        return
+    save_predictor(predictor, path, meta)
+    logger.info("Exported fused predictor to %s", path)
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# Incremental Retraining
+# ═══════════════════════════════════════════════════════════════════════════
+
+def _incremental_retrain(
+    ticker: str,
+    X: pd.DataFrame,
+    target,
+    horizon: int,
+    score,
+    n_jobs: int,
+    dtype=None,
+) -> dict:
+    """
+    Update the saved model with the bars that arrived since it was trained.
+
+    The Random Forest gets ``INCREMENTAL_TREES`` warm-started trees fitted on
+    the last ``INCREMENTAL_WINDOW`` bars; a linear model adds the new bars
+    to its XᵀX / Xᵀy.  The scaler is kept, so existing trees stay valid.
+
+    Returns
+    -------
+    dict or None
+        Training results, or None when a full refit is needed (no usable
+        model, unsupported model type, or a drift threshold crossed).
+    """
+    import joblib
+
+    safe_ticker = ticker.upper().replace("/", "_")
+    model_path, scaler_path, meta_path = [
+        os.path.join(MODELS_DIR, f"{safe_ticker}_{kind}.pkl")
+        for kind in ("model", "scaler", "meta")
+    ]
+    if not all(os.path.exists(p) for p in (model_path, scaler_path, meta_path)):
+        logger.info("No saved model for %s — full refit", ticker)
+        return None
+
+    meta = joblib.load(meta_path)
+    model = joblib.load(model_path)
+    if meta.get("last_bar") is None:
+        reason = "saved model predates incremental retraining"
+    elif meta.get("horizon") != horizon:
+        reason = "forecast mode changed"
+    elif meta["feature_names"] != X.columns.tolist():
+        reason = "feature set changed"
+    elif meta.get("dtype", "float64") != np.dtype(dtype or np.float64).name:
+        reason = "feature dtype changed"
+    elif not isinstance(model, (RandomForestRegressor, IncrementalLinearRegression)):
+        reason = f"{type(model).__name__} cannot be updated incrementally"
+    else:
+        reason = None
+    if reason is not None:
+        logger.info("Full refit for %s: %s", ticker, reason)
+        return None
+
+    summary = {
+        "ticker": ticker,
+        "best_model": meta["best_model"],
+        "forecast_mode": meta["forecast_mode"],
+        "horizon": horizon,
+        "all_results": {meta["best_model"]: meta["metrics"]},
+        "best_metrics": meta["metrics"],
+    }
+    new = X.index > pd.Timestamp(meta["last_bar"])
+    n_new = int(new.sum())
+    if n_new == 0:
+        logger.info("%s is up to date (last bar %s)", ticker, meta["last_bar"])
+        return {**summary, "retrain": "up_to_date", "new_bars": 0}
+
+    # ── Drift checks, on the new bars before the model has seen them ──────
+    scaler = joblib.load(scaler_path)
+    X_new, _ = scale_features(X[new], scaler=scaler, dtype=dtype)
+    t_new = target[new]
+    new_metrics = score(t_new.values, model.predict(X_new))
+    bars_since_full = meta.get("bars_since_full_fit", 0) + n_new
+    rmse_ratio = new_metrics["rmse"] / max(meta["metrics"]["rmse"], 1e-12)
+    # Against every bar up to last_bar, not just the scaler's training split
+    X_raw = X[new].to_numpy(dtype=np.float64)
+    low = np.asarray(meta.get("feature_min", scaler.data_min_), dtype=np.float64)
+    high = np.asarray(meta.get("feature_max", scaler.data_max_), dtype=np.float64)
+    out_of_range = float(np.mean((X_raw < low) | (X_raw > high)))
+
+    if bars_since_full > DRIFT_MAX_BARS:
+        reason = f"{bars_since_full} bars since the last full fit"
+    elif n_new >= DRIFT_MIN_BARS and rmse_ratio > DRIFT_RMSE_RATIO:
+        reason = f"RMSE on new bars is {rmse_ratio:.1f}x the fitted RMSE"
+    elif out_of_range > DRIFT_OUT_OF_RANGE:
+        reason = f"{out_of_range:.0%} of new feature values are outside the fitted range"
+    if reason is not None:
+        logger.info("Full refit for %s: %s", ticker, reason)
+        return None
+
+    # ── Update ────────────────────────────────────────────────────────────
+    if isinstance(model, RandomForestRegressor):
+        recent = slice(max(0, len(X) - INCREMENTAL_WINDOW), len(X))
+        excess = len(model.estimators_) + INCREMENTAL_TREES - INCREMENTAL_MAX_TREES
+        if excess > 0:
+            model.estimators_ = model.estimators_[excess:]  # oldest first
+        model.set_params(
+            warm_start=True,
+            n_estimators=len(model.estimators_) + INCREMENTAL_TREES,
+            n_jobs=n_jobs,
+        )
+        X_recent, _ = scale_features(X.iloc[recent], scaler=scaler, dtype=dtype)
+        model.fit(X_recent, target.iloc[recent])
+    else:
+        model.partial_fit(X_new, t_new)
+
+    meta = {
+        **meta,
+        "last_bar": str(X.index[-1]),
+        "feature_min": np.minimum(low, X_raw.min(axis=0)).tolist(),
+        "feature_max": np.maximum(high, X_raw.max(axis=0)).tolist(),
+        "bars_since_full_fit": bars_since_full,
+        "incremental_updates": meta.get("incremental_updates", 0) + 1,
+        "incremental_metrics": new_metrics,
+    }
+    save_model(model, model_path)
+    joblib.dump(meta, meta_path)
+    export_predictor(model, scaler, meta, model_path, X[new], dtype)
+    logger.info(
+        "Incrementally updated %s (%s) with %d new bars — RMSE on them: %.4f",
+        ticker, meta["best_model"], n_new, new_metrics["rmse"],
+    )
+
+    summary["all_results"]["Incremental_NewBars"] = new_metrics
+    return {**summary, "retrain": "incremental", "new_bars": n_new}
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -158,13 +426,18 @@ def train_model(
     ticker: str,
     period: str = "5y",
     tune: bool = True,
+    horizon: int = None,
+    progress=None,
+    n_jobs: int = -1,
+    incremental: bool = False,
+    float32: bool = FLOAT32,
 ) -> dict:
     """
     End-to-end training pipeline for a given ticker.
 
     Steps:
       1. Fetch data
-      2. Engineer features
+      2. Engineer features (only for bars not already in the feature store)
       3. Split (time-based)
       4. Scale
       5. Train & compare regression models (LR, DT, RF)
@@ -172,50 +445,107 @@ def train_model(
       7. (Optionally) tune Random Forest
       8. Save the best model + scaler + metadata
 
+    Parameters
+    ----------
+    ticker : str
+        Stock ticker symbol.
+    period : str
+        yfinance history period to train on.
+    tune : bool
+        Tune the Random Forest if it is the best model.
+    horizon : int or None
+        If set, train a direct multi-output model for Close at t+1 … t+horizon
+        instead of the single-step model used by the recursive forecast.
+    progress : callable or None
+        Called as ``progress(fraction, stage)`` as the pipeline advances.
+    n_jobs : int
+        Cores available to this ticker's model fitting (-1 = all).  Set it
+        when several tickers train side by side (see ``src.batch_train``).
+    incremental : bool
+        Update the saved model with the bars since its last fit instead of
+        retraining everything; falls back to the full pipeline when a drift
+        threshold is crossed (see ``_incremental_retrain``).
+    float32 : bool
+        Build, scale and fit on float32 feature arrays (default: the
+        ``STOCK_FLOAT32`` environment variable).  Prediction follows the
+        dtype the model was trained with.
+
     Returns
     -------
     dict
         Training results including metrics for each model.
     """
+    if horizon is not None and not 1 <= horizon <= MAX_DIRECT_HORIZON:
+        raise ValueError(f"horizon must be between 1 and {MAX_DIRECT_HORIZON}, got {horizon}.")
     os.makedirs(MODELS_DIR, exist_ok=True)
 
+    def report(fraction: float, stage: str) -> None:
+        if progress is not None:
+            progress(fraction, stage)
+
     # ── Step 1: Fetch ─────────────────────────────────────────────────────
+    report(0.0, "fetching data")
     logger.info("Fetching data for %s (period=%s)...", ticker, period)
     df = fetch_stock_data(ticker, period=period)
 
-    # ── Step 2: Feature Engineering ───────────────────────────────────────
-    df = add_all_technical_indicators(df)
-    X, y = prepare_features(df, target_col="Close")
+    # ── Step 2: Feature Engineering (reused from the feature store) ───────
+    # Rows are computed over the ticker's stored history, so the first rows
+    # of a shorter period are warmed up rather than dropped as NaN
+    report(0.1, "engineering features")
+    dtype = np.float32 if float32 else None
+    X, y = feature_store.features(ticker, df, target_col="Close", dtype=dtype)
     feature_names = X.columns.tolist()
 
+    if horizon is None:
+        target = y
+        score = compute_metrics
+        rank_key = "rmse"
+    else:
+        # Drop the last rows, whose future closes are not known yet
+        target = direct_targets(y, horizon)
+        known = target.notna().all(axis=1)
+        X, y, target = X[known], y[known], target[known]
+        score = compute_horizon_metrics
+        rank_key = "mean_horizon_rmse"
+
+    if incremental:
+        report(0.2, "updating model incrementally")
+        result = _incremental_retrain(ticker, X, target, horizon, score, n_jobs, dtype)
+        if result is not None:
+            return result
+
     # ── Step 3: Time-based Split ──────────────────────────────────────────
     X_train, X_test, y_train, y_test = time_based_split(X, y, test_ratio=0.2)
+    split_idx = len(X_train)
+    t_train, t_test = target.iloc[:split_idx], target.iloc[split_idx:]
     logger.info("Train size: %d | Test size: %d", len(X_train), len(X_test))
 
     # ── Step 4: Scale ─────────────────────────────────────────────────────
-    X_train_scaled, scaler = scale_features(X_train)
-    X_test_scaled, _ = scale_features(X_test, scaler=scaler)
+    X_train_scaled, scaler = scale_features(X_train, dtype=dtype)
+    X_test_scaled, _ = scale_features(X_test, scaler=scaler, dtype=dtype)
 
     # ── Step 5: Train & Compare Regression Models ─────────────────────────
-    models = _get_regression_models()
+    models = _get_regression_models(n_jobs)
     results = {}
     best_model_name = None
     best_rmse = float("inf")
 
-    for name, model in models.items():
+    for i, (name, model) in enumerate(models.items()):
+        report(0.2 + 0.4 * i / len(models), f"training {name}")
         logger.info("Training %s...", name)
-        model.fit(X_train_scaled, y_train)
+        model.fit(X_train_scaled, t_train)
         preds = model.predict(X_test_scaled)
-        metrics = compute_metrics(y_test.values, preds)
+        metrics = score(t_test.values, preds)
         results[name] = metrics
         logger.info("%s — RMSE: %.4f | MAE: %.4f | Dir Acc: %.2f%%",
                      name, metrics["rmse"], metrics["mae"], metrics["directional_accuracy"])
 
-        if metrics["rmse"] < best_rmse:
-            best_rmse = metrics["rmse"]
+        if metrics[rank_key] < best_rmse:
+            best_rmse = metrics[rank_key]
             best_model_name = name
 
     # ── Step 6: Logistic Regression for Direction ─────────────────────────
+    report(0.6, "training direction model")
     # Create binary target: 1 = price went up, 0 = price went down
     y_train_dir = (y_train.diff().dropna() > 0).astype(int)
     y_test_dir = (y_test.diff().dropna() > 0).astype(int)
@@ -244,41 +574,66 @@ def train_model(
 
     # ── Step 7: Tune (Random Forest) ──────────────────────────────────────
     if tune and best_model_name == "RandomForest":
+        report(0.65, "tuning RandomForest")
         logger.info("Tuning Random Forest...")
-        tuned_model = tune_random_forest(X_train_scaled, y_train)
+        safe_ticker = ticker.upper().replace("/", "_")
+        tuned_model = tune_random_forest(
+            X_train_scaled,
+            t_train,
+            n_jobs=n_jobs,
+            cache_path=os.path.join(MODELS_DIR, f"{safe_ticker}_tuning.json"),
+        )
         preds = tuned_model.predict(X_test_scaled)
-        tuned_metrics = compute_metrics(y_test.values, preds)
+        tuned_metrics = score(t_test.values, preds)
         results["RandomForest_Tuned"] = tuned_metrics
         logger.info("Tuned RandomForest — RMSE: %.4f | MAE: %.4f",
                      tuned_metrics["rmse"], tuned_metrics["mae"])
 
-        if tuned_metrics["rmse"] < best_rmse:
+        if tuned_metrics[rank_key] < best_rmse:
             best_model_name = "RandomForest_Tuned"
             models["RandomForest_Tuned"] = tuned_model
 
     # ── Step 8: Save ──────────────────────────────────────────────────────
+    report(0.95, "saving artifacts")
     best_model = models[best_model_name]
+    if isinstance(best_model, IncrementalLinearRegression):
+        # Later partial_fit calls only add bars after last_bar, so the
+        # sufficient statistics must cover the test split too
+        best_model.partial_fit(X_test_scaled, t_test)
     safe_ticker = ticker.upper().replace("/", "_")
     model_path = os.path.join(MODELS_DIR, f"{safe_ticker}_model.pkl")
     scaler_path = os.path.join(MODELS_DIR, f"{safe_ticker}_scaler.pkl")
     meta_path = os.path.join(MODELS_DIR, f"{safe_ticker}_meta.pkl")
 
-    joblib.dump(best_model, model_path)
+    save_model(best_model, model_path)  # plus a memory-mappable .flat for trees
     joblib.dump(scaler, scaler_path)
-    joblib.dump({
+    meta = {
         "ticker": ticker,
         "best_model": best_model_name,
         "feature_names": feature_names,
         "metrics": results[best_model_name],
-    }, meta_path)
+        "forecast_mode": "recursive" if horizon is None else "direct",
+        "horizon": horizon,
+        "last_bar": str(X.index[-1]),
+        # Range of every row up to last_bar, for the incremental drift check
+        "feature_min": X.min(axis=0).to_numpy(dtype=np.float64).tolist(),
+        "feature_max": X.max(axis=0).to_numpy(dtype=np.float64).tolist(),
+        "bars_since_full_fit": 0,
+        "dtype": "float32" if float32 else "float64",
+    }
+    joblib.dump(meta, meta_path)
+    export_predictor(best_model, scaler, meta, model_path, X_test, dtype)
 
     logger.info("Saved best model (%s) to %s", best_model_name, model_path)
 
     return {
         "ticker": ticker,
         "best_model": best_model_name,
+        "forecast_mode": "recursive" if horizon is None else "direct",
+        "horizon": horizon,
         "all_results": results,
         "best_metrics": results[best_model_name],
+        "retrain": "full",
     }
 
 
@@ -0,0 +1,205 @@
+"""
+tuning.py — Successive-Halving Hyperparameter Search
+=====================================================
+Random Forest tuning that spends most of its budget on promising
+configurations.
+
+Candidates are first scored cheaply on few trees and the most recent
+part of each training fold; only the best 1/``eta`` of them move to the
+next rung, which gets ``eta`` times the resource.  The resource is split
+evenly between forest size and training-window length (both grow by
+√eta per rung), so the cost of one fit grows by roughly ``eta``.
+
+Fold scores are cached in a JSON file keyed by parameters, resource and
+a hash of the fold's data, and the best parameters of the previous run
+always enter the first rung, so re-tuning after new data starts from
+the previous winner.
+
+Author : Student ML Engineer
+Project: Stock Price Prediction System
+"""
+
+import os
+import json
+import hashlib
+import logging
+import numpy as np
+
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.model_selection import ParameterSampler, TimeSeriesSplit
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+N_CANDIDATES = 27
+ETA = 3
+MAX_RUNG_TREES = 200  # forest size used to rank finalists
+MIN_WINDOW_ROWS = 60  # never score on fewer training rows than this
+CACHE_MAX_ENTRIES = 5000
+
+logger = logging.getLogger(__name__)
+
+
+def _params_key(params: dict) -> str:
+    return json.dumps(params, sort_keys=True)
+
+
+def _digest(*arrays) -> str:
+    h = hashlib.sha1()
+    for arr in arrays:
+        h.update(np.ascontiguousarray(arr).tobytes())
+    return h.hexdigest()[:16]
+
+
+def _fit_score(params: dict, n_estimators: int, X_tr, y_tr, X_val, y_val, random_state: int) -> float:
+    """RMSE of one forest on one validation fold."""
+    model = RandomForestRegressor(
+        n_estimators=n_estimators, random_state=random_state, n_jobs=1, **params
+    )
+    model.fit(X_tr, y_tr)
+    return float(np.sqrt(np.mean((model.predict(X_val) - y_val) ** 2)))
+
+
+class TuningCache:
+    """
+    Fold scores and best parameters of previous searches, in a JSON file.
+
+    Parameters
+    ----------
+    path : str or None
+        Cache file.  None keeps the cache in memory only.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path
+        self.state = {"best_params": None, "folds": {}}
+        if path and os.path.exists(path):
+            try:
+                with open(path) as fh:
+                    self.state = json.load(fh)
+            except (OSError, ValueError) as exc:
+                logger.warning("Ignoring unreadable tuning cache %s: %s", path, exc)
+
+    @property
+    def best_params(self):
+        return self.state.get("best_params")
+
+    def get(self, key: str):
+        return self.state["folds"].get(key)
+
+    def put(self, key: str, rmse: float) -> None:
+        self.state["folds"][key] = rmse
+
+    def save(self, best_params: dict) -> None:
+        """Record the winner and write the file atomically."""
+        self.state["best_params"] = best_params
+        folds = self.state["folds"]
+        # Keep the newest entries (dicts preserve insertion order)
+        if len(folds) > CACHE_MAX_ENTRIES:
+            self.state["folds"] = dict(list(folds.items())[-CACHE_MAX_ENTRIES:])
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as fh:
+            json.dump(self.state, fh)
+        os.replace(tmp_path, self.path)
+
+
+def successive_halving_search(
+    X: np.ndarray,
+    y: np.ndarray,
+    param_distributions: dict,
+    n_candidates: int = N_CANDIDATES,
+    eta: int = ETA,
+    max_trees: int = MAX_RUNG_TREES,
+    n_splits: int = 5,
+    n_jobs: int = -1,
+    cache_path: str = None,
+    random_state: int = 42,
+) -> tuple:
+    """
+    Successive halving over Random Forest parameters with TimeSeriesSplit.
+
+    Parameters
+    ----------
+    X, y : np.ndarray
+        Training data in chronological order (``y`` may be 2-D).
+    param_distributions : dict
+        Parameter lists to sample candidates from (without ``n_estimators``,
+        which is part of the resource).
+    n_candidates, eta : int
+        Candidates in the first rung and the elimination factor.
+    max_trees : int
+        Forest size in the last rung.
+    n_jobs : int
+        Cores for the (candidate, fold) fits; every forest uses one.
+    cache_path : str or None
+        Tuning cache file (see ``TuningCache``).
+
+    Returns
+    -------
+    tuple of (best_params: dict, best_rmse: float)
+    """
+    from joblib import Parallel, delayed
+
+    X = np.asarray(X)
+    y = np.asarray(y)
+    cache = TuningCache(cache_path)
+
+    candidates = [
+        dict(sorted(p.items()))
+        for p in ParameterSampler(param_distributions, n_candidates, random_state=random_state)
+    ]
+    previous = cache.best_params
+    if previous is not None and previous not in candidates:
+        candidates[-1] = previous
+
+    folds = list(TimeSeriesSplit(n_splits=n_splits).split(X))
+    # Halve until the last rung would hold fewer than eta candidates
+    n_rungs = 1
+    while len(candidates) // eta ** n_rungs >= eta:
+        n_rungs += 1
+    scores = {}
+
+    for rung in range(n_rungs):
+        # Both resources grow by √eta per rung; the last rung uses the full budget
+        fraction = eta ** ((rung + 1 - n_rungs) / 2)
+        n_estimators = max(10, round(max_trees * fraction))
+
+        jobs = []
+        for train_idx, val_idx in folds:
+            rows = min(len(train_idx), max(MIN_WINDOW_ROWS, round(len(train_idx) * fraction)))
+            window = train_idx[-rows:]  # most recent rows of the fold
+            fold_key = _digest(X[window], y[window], X[val_idx], y[val_idx])
+            for c, params in enumerate(candidates):
+                key = f"{_params_key(params)}|{n_estimators}|{fold_key}"
+                jobs.append((c, key, params, window, val_idx))
+
+        todo = [job for job in jobs if cache.get(job[1]) is None]
+        results = Parallel(n_jobs=n_jobs)(
+            delayed(_fit_score)(params, n_estimators, X[window], y[window], X[val_idx], y[val_idx], random_state)
+            for _, _, params, window, val_idx in todo
+        )
+        for (_, key, _, _, _), rmse in zip(todo, results):
+            cache.put(key, rmse)
+
+        rung_scores = [[] for _ in candidates]
+        for c, key, _, _, _ in jobs:
+            rung_scores[c].append(cache.get(key))
+        scores = {c: float(np.mean(s)) for c, s in enumerate(rung_scores)}
+
+        logger.info(
+            "Rung %d/%d: %d candidates, %d trees, %.0f%% window, %d fits (%d cached) — best RMSE %.4f",
+            rung + 1, n_rungs, len(candidates), n_estimators, fraction * 100,
+            len(jobs), len(jobs) - len(todo), min(scores.values()),
+        )
+
+        if rung < n_rungs - 1:
+            keep = max(1, len(candidates) // eta)
+            ranked = sorted(scores, key=scores.get)[:keep]
+            candidates = [candidates[c] for c in ranked]
+
+    best = min(scores, key=scores.get)
+    cache.save(candidates[best])
+    return candidates[best], scores[best]